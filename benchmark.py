@@ -0,0 +1,266 @@
+"""Benchmarks generate.py on synthetic sites.
+
+Every scenario writes a site with the requested number of publications, project pages with
+videos and long author lists into a temporary directory, then builds it from scratch with the
+real generator in a child process and records wall time, peak RSS, bytes written and per-page
+latency percentiles. Results go to a JSON file; --baseline compares them against an earlier
+run and fails when a metric grows past --threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+REPOSITORY = os.path.dirname(os.path.abspath(__file__))
+RESULTS = 'benchmark-results.json'
+
+# Metrics compared against the baseline, all better when lower, with the growth below which
+# a change is measurement noise whatever its relative size
+COMPARED_METRICS = {
+  'wall_time_s': 0.05,
+  'peak_rss_kib': 1024,
+  'latency_ms.p50': 1,
+  'latency_ms.p95': 1,
+  'bytes_written': 4096,
+}
+
+def write_json(path, data):
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  with open(path, "w", encoding="utf-8") as file:
+    json.dump(data, file)
+
+def make_box(kind, payload):
+  return struct.pack('>I4s', 8 + len(payload), kind) + payload
+
+def make_video(path, size):
+  """Writes a minimal faststart MP4: ftyp, a moov holding the duration and frame size, and size bytes of media data."""
+  mvhd = struct.pack('>B3xIIII', 0, 0, 0, 1000, 10000) + bytes(80)
+  tkhd = bytes(76) + struct.pack('>II', 1280 << 16, 720 << 16)
+  moov = make_box(b'moov', make_box(b'mvhd', mvhd) + make_box(b'trak', make_box(b'tkhd', tkhd)))
+  with open(path, 'wb') as file:
+    file.write(make_box(b'ftyp', b'isom' + bytes(4) + b'isommp41'))
+    file.write(moov)
+    file.write(make_box(b'mdat', bytes(size)))
+
+def synthesize_site(root, publications, projects, videos, authors, people, ongoing, video_size):
+  """Writes content/ and the static part of docs/ for a site of the given size into root."""
+  content = os.path.join(root, 'content')
+  docs = os.path.join(root, 'docs')
+  shutil.copytree(os.path.join(REPOSITORY, 'docs', 'assets'), os.path.join(docs, 'assets'))
+  shutil.copytree(os.path.join(REPOSITORY, 'docs', 'data', 'images', 'thumbnails'),
+                  os.path.join(docs, 'data', 'images', 'thumbnails'))
+  shutil.copytree(os.path.join(REPOSITORY, 'content', 'courses'), os.path.join(content, 'courses'))
+  shutil.copy(os.path.join(REPOSITORY, 'content', 'about.json'), os.path.join(content, 'about.json'))
+  images = sorted(os.listdir(os.path.join(docs, 'data', 'images', 'thumbnails')))
+
+  for i in range(people):
+    write_json(os.path.join(content, 'people', f'person{i}.json'),
+               {'name': f'Author {i}', 'website': f'https://example.org/~author{i}' if i % 3 else '', 'me': i == 0})
+
+  # A few videos are shared by all projects, like a real site reusing clips
+  media = os.path.join(root, 'media')
+  os.makedirs(media)
+  sources = []
+  for i in range(min(videos, 8)):
+    sources.append(os.path.join('media', f'clip{i}.mp4'))
+    make_video(os.path.join(root, sources[-1]), video_size)
+
+  for i in range(publications):
+    byline = [f'person{(i * 7 + j * 13) % people}' for j in range(min(authors, people))]
+    byline = list(dict.fromkeys(['person0'] + byline))[:min(authors, people)]
+    has_project = i < projects
+    write_json(os.path.join(content, 'publications', f'pub{i}.json'), {
+      'image': f'data/images/thumbnails/{images[i % len(images)]}',
+      'title': f'Scalable analysis of synthetic structure number {i} in gigavoxel volumes',
+      'url': f'project/pub{i}' if has_project else f'https://example.org/papers/{i}',
+      'authors': byline,
+      'joint_authors': {'*': byline[:max(1, len(byline) // 2)]},
+      'venue': f'Proceedings of the Synthetic Conference {2000 + i % 25}',
+      'award': 'Best Paper Award' if i % 50 == 0 else '',
+    })
+    if has_project:
+      write_json(os.path.join(content, 'projects', f'pub{i}.json'), {
+        'image': f'../../data/images/thumbnails/{images[i % len(images)]}',
+        'image_caption': f'Overview of synthetic structure {i}.',
+        'abstract': ' '.join(f'Sentence {j} of the abstract of project {i} about segmentation.' for j in range(12)),
+        'resources': {
+          'publication': [{'icon': 'PDF', 'name': 'Paper', 'path': f'https://example.org/papers/{i}.pdf'}],
+          'code': [{'icon': 'GITHUB', 'name': 'Code', 'path': f'https://github.com/example/project{i}'}],
+        },
+        'videos': [{'name': f'Video {j}', 'id': sources[j % len(sources)]} for j in range(videos)],
+        'citation': f'@inproceedings{{pub{i}, title={{Synthetic structure {i}}}}}',
+      })
+
+  for i in range(ongoing):
+    write_json(os.path.join(content, 'ongoing', f'{i}.json'), {
+      'image': f'data/images/thumbnails/{images[i % len(images)]}',
+      'title': f'Ongoing synthetic project {i}',
+      'url': f'ongoing/pro{i}',
+      'details': [f'Detail {j} of ongoing project {i}.' for j in range(5)],
+    })
+  for folder in ['projects', 'ongoing']:
+    os.makedirs(os.path.join(content, folder), exist_ok=True)
+
+def get_tree_size(directory):
+  size = 0
+  for folder, _, files in os.walk(directory):
+    size += sum(os.path.getsize(os.path.join(folder, name)) for name in files)
+  return size
+
+def get_percentile(values, fraction):
+  if not values:
+    return 0
+  ordered = sorted(values)
+  return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def run_build(root, options):
+  """Builds the site in root with generate.py and returns the measurements; runs in a child process."""
+  import resource
+  sys.path.insert(0, REPOSITORY)
+  os.chdir(root)
+  import generate
+
+  # Time every page as the serial build renders it
+  latencies = []
+  render_page = generate.render_page
+  def timed_render_page(page):
+    start = time.perf_counter()
+    try:
+      return render_page(page)
+    finally:
+      latencies.append((time.perf_counter() - start) * 1000)
+  generate.render_page = timed_render_page
+
+  size = get_tree_size('docs')
+  start = time.perf_counter()
+  with contextlib.redirect_stdout(io.StringIO()):
+    generate.build('docs/', force=True, jobs=1, **options)
+  wall_time = time.perf_counter() - start
+
+  # ru_maxrss is in KiB on Linux and in bytes on macOS
+  peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  if sys.platform == 'darwin':
+    peak_rss //= 1024
+  return {
+    'pages': len(latencies),
+    'wall_time_s': wall_time,
+    'peak_rss_kib': peak_rss,
+    'bytes_written': get_tree_size('docs') - size,
+    'latency_ms': {
+      'p50': get_percentile(latencies, 0.50),
+      'p90': get_percentile(latencies, 0.90),
+      'p95': get_percentile(latencies, 0.95),
+      'p99': get_percentile(latencies, 0.99),
+      'max': max(latencies, default=0),
+    },
+  }
+
+def run_scenario(publications, args):
+  with tempfile.TemporaryDirectory(prefix='site-benchmark-') as root:
+    start = time.perf_counter()
+    synthesize_site(root, publications, min(publications, args.projects), args.videos, args.authors,
+                    args.people, args.ongoing, args.video_size)
+    synthesis_time = time.perf_counter() - start
+
+    command = [sys.executable, os.path.abspath(__file__), '--run-build', root,
+               '--generator-options', json.dumps(args.options)]
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    result = json.loads(output.splitlines()[-1])
+    result['synthesis_time_s'] = synthesis_time
+    return result
+
+def get_metric(result, name):
+  for key in name.split('.'):
+    result = result[key]
+  return result
+
+def compare(results, baseline, threshold):
+  """Prints every compared metric next to its baseline and returns the regressions past threshold."""
+  regressions = []
+  print(f'{"scenario":<20} {"metric":<16} {"baseline":>14} {"current":>14} {"change":>8}')
+  for name, result in results['scenarios'].items():
+    if name not in baseline['scenarios']:
+      print(f'{name:<20} (not in the baseline)')
+      continue
+    for metric, noise in COMPARED_METRICS.items():
+      before = get_metric(baseline['scenarios'][name], metric)
+      after = get_metric(result, metric)
+      change = (after - before) / before if before else 0
+      flag = ''
+      if change > threshold and after - before > noise:
+        regressions.append((name, metric, change))
+        flag = '  REGRESSION'
+      print(f'{name:<20} {metric:<16} {before:>14.2f} {after:>14.2f} {change:>+8.1%}{flag}')
+  return regressions
+
+def parse_sizes(value):
+  return [int(size) for size in value.split(',')]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark generate.py on synthetic sites.')
+    parser.add_argument('--sizes', type=parse_sizes, default=[10, 1000, 50000], metavar='N,N,...',
+                        help='number of publications of each scenario (default: 10,1000,50000)')
+    parser.add_argument('--projects', type=int, default=200, metavar='N',
+                        help='publications that get a project page, at most (default: 200)')
+    parser.add_argument('--videos', type=int, default=3, metavar='N',
+                        help='videos on every project page (default: 3)')
+    parser.add_argument('--video-size', type=int, default=1 << 20, metavar='BYTES',
+                        help='size of the synthetic videos (default: 1 MiB)')
+    parser.add_argument('--authors', type=int, default=12, metavar='N',
+                        help='authors per publication, the first half of them joint (default: 12)')
+    parser.add_argument('--people', type=int, default=500, metavar='N',
+                        help='distinct authors the publications draw from (default: 500)')
+    parser.add_argument('--ongoing', type=int, default=20, metavar='N',
+                        help='ongoing projects (default: 20)')
+    parser.add_argument('--generator-options', dest='options', type=json.loads, default={}, metavar='JSON',
+                        help='extra build options as a JSON object, e.g. \'{"minify_html": true}\'')
+    parser.add_argument('--output', default=RESULTS,
+                        help=f'file the results are written to (default: {RESULTS})')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='largest accepted relative growth of a metric over the baseline (default: 0.2)')
+    parser.add_argument('--run-build', metavar='DIRECTORY', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_build:
+      print(json.dumps(run_build(args.run_build, args.options)))
+      sys.exit()
+
+    results = {
+      'python': platform.python_version(),
+      'machine': platform.machine(),
+      'settings': {
+        'projects': args.projects, 'videos': args.videos, 'video_size': args.video_size,
+        'authors': args.authors, 'people': args.people, 'ongoing': args.ongoing, 'options': args.options,
+      },
+      'scenarios': {},
+    }
+    for size in args.sizes:
+      name = f'publications-{size}'
+      print(f'{name}: synthesizing and building...', flush=True)
+      result = results['scenarios'][name] = run_scenario(size, args)
+      latency = result['latency_ms']
+      print(f'  {result["pages"]} pages in {result["wall_time_s"]:.2f} s, peak RSS {result["peak_rss_kib"] / 1024:.1f} MiB, '
+            f'{result["bytes_written"] / 1024 / 1024:.1f} MiB written, page latency p50 {latency["p50"]:.1f} ms, '
+            f'p95 {latency["p95"]:.1f} ms, max {latency["max"]:.1f} ms')
+
+    with open(args.output, "w", encoding="utf-8") as file:
+      json.dump(results, file, indent=1)
+    print(f'Results written to {args.output}')
+
+    if args.baseline:
+      with open(args.baseline, encoding="utf-8") as file:
+        baseline = json.load(file)
+      regressions = compare(results, baseline, args.threshold)
+      if regressions:
+        print(f'{len(regressions)} metrics grew by more than {args.threshold:.0%}')
+        sys.exit(1)
@@ -1,7 +1,27 @@
 from enum import Enum
+from html import unescape
+import argparse
+from collections import Counter
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import functools
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import operator
 import os
-from bs4 import BeautifulSoup
+import re
 import shutil
+import string
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+from urllib.parse import unquote
 
 
 STYLE_ASSETS = [
@@ -10,6 +30,10 @@ STYLE_ASSETS = [
   'style.css'
 ]
 
+# Font Awesome sources the inline SVG icons are cut from, relative to the assets folder
+ICON_STYLESHEET = 'font-awesome/css/font-awesome.css'
+ICON_FONT = 'font-awesome/fonts/fontawesome-webfont.svg'
+
 class FontAwesomeIcons(str, Enum):
   NONE        = ""
   PDF         = "fa fa-fw fa-file-pdf-o"
@@ -32,465 +56,2131 @@ class FontAwesomeIcons(str, Enum):
   def __str__(self):
     return self.value
 
-class Person:
-  def __init__(self, name, website, me = False):
-    self.name = name
-    self.website = website
-    self.me = me 
-
-class Publication:
-  def __init__(self, 
-               image, 
-               title, 
-               url,
-               authors = [], 
-               joint_authors = {},
-               venue = '', 
-               award = ''):
-    self.image = image
-    self.title = title
-    self.url = url 
-    self.authors = authors 
-    self.joint_authors = joint_authors
-    self.venue = venue
-    self.award = award
-
-  def get_author_suffix(self, author):
-    suffix = ''
-    for contribution_suffix, authors in self.joint_authors.items():
-      if author in authors:
-        suffix = contribution_suffix
-    return suffix
-
-  def get_author_names(self):
-    names = ''
-    for i, author in enumerate(self.authors):
-      name = author.name
-      name += self.get_author_suffix(author)
-
-      if (author.me):
-        names += f'<b>{name}</b>'
-
-      elif (len(author.website) > 0):
-        names += f'<a href={author.website}>{name}</a>'
-
-      else:
-        names += name
-      
-      if i == len(self.authors) - 2:
-        names += ", "
-      elif i < len(self.authors) - 1:
-        names += ", "
-
-    return names
+ASSET_STORE = '.asset-store'
+
+# Build settings shared with worker processes; set from the command line
+OPTIONS = {
+  'validate': False,
+  'thumbnails': True,
+  'asset_store': ASSET_STORE,
+  'verify_media': False,
+  'media_jobs': 4,
+  'video_loading': 'lazy',
+  'faststart': True,
+  'bundle_css': False,
+  # Extra classes (or #ids) the css bundle keeps, for markup added by your own scripts
+  'css_safelist': [],
+  'icons': 'svg',
+  'fingerprint_assets': False,
+  'minify_html': False,
+  'precompress': False,
+  # Items shown per page of a home page section, e.g. {'publications': 20}; unset shows all
+  'page_sizes': {},
+  'listing_index': False,
+  'search': False,
+  'author_pages': False,
+  'profile': False,
+  'service_worker': False,
+  # Glyphs of the FontAwesomeIcons values as {icon: [advance, path]}, loaded by build()
+  'icon_glyphs': {},
+}
 
-class ProjectResources:
-  def __init__(self, publication = [], code = []):
-    self.publication = publication
-    self.code = code
+# Options that do not change the rendered output
+BUILD_ONLY_OPTIONS = {'validate', 'asset_store', 'verify_media', 'media_jobs', 'precompress', 'profile', 'css_safelist'}
+
+# Memos of the @partial functions, which may read OPTIONS
+PARTIAL_CACHES = []
+
+def configure(options):
+  OPTIONS.update(options)
+  for rendered in PARTIAL_CACHES:
+    rendered.clear()
+
+# Counters reported at the end of a build, e.g. template cache hits and misses
+STATS = Counter()
+
+class Profiler:
+  """Times the phases of each page and measures their allocations with tracemalloc when
+  OPTIONS['profile'] is set. Spans nest; each one records its own allocation peak."""
+
+  def __init__(self):
+    self.clear()
+
+  def clear(self):
+    self.spans = []
+    self.stack = []
+    self.page = None
+
+  @contextlib.contextmanager
+  def span(self, name):
+    if not OPTIONS['profile']:
+      yield
+      return
+    if not tracemalloc.is_tracing():
+      tracemalloc.start()
+    self.update_peaks()
+    entry = {'start': time.perf_counter_ns(), 'memory': tracemalloc.get_traced_memory()[0], 'peak': 0}
+    self.stack.append(entry)
+    try:
+      yield
+    finally:
+      self.update_peaks()
+      self.stack.pop()
+      self.spans.append({
+        'page': self.page, 'name': name, 'depth': len(self.stack), 'pid': os.getpid(),
+        'start': entry['start'], 'duration': time.perf_counter_ns() - entry['start'],
+        'allocated': tracemalloc.get_traced_memory()[0] - entry['memory'],
+        'peak': entry['peak'] - entry['memory'],
+      })
+
+  def update_peaks(self):
+    # The tracemalloc peak is reset at every span boundary, so pass it on to the open spans first
+    peak = tracemalloc.get_traced_memory()[1]
+    for entry in self.stack:
+      entry['peak'] = max(entry['peak'], peak)
+    tracemalloc.reset_peak()
+
+  def take(self):
+    spans, self.spans = self.spans, []
+    return spans
+
+PROFILER = Profiler()
+
+# Content hashes of source files as [size, mtime, sha256], kept in the build manifest
+FILE_HASHES = {}
+
+def get_content_hash(path):
+  digest = hashlib.sha256()
+  with open(path, 'rb') as file:
+    for block in iter(lambda: file.read(1 << 20), b''):
+      digest.update(block)
+  return digest.hexdigest()
+
+def hash_file(path):
+  # Only re-hash files whose size or mtime changed since they were last hashed
+  stat = os.stat(path)
+  cached = FILE_HASHES.get(path)
+  if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+    return cached[2]
+  digest = get_content_hash(path)
+  FILE_HASHES[path] = [stat.st_size, stat.st_mtime_ns, digest]
+  return digest
+
+def is_file_content(path, size, digest):
+  return os.path.isfile(path) and os.path.getsize(path) == size and hash_file(path) == digest
+
+def record_file_hash(path, digest):
+  stat = os.stat(path)
+  FILE_HASHES[path] = [stat.st_size, stat.st_mtime_ns, digest]
+
+def write_file(path, data):
+  """Atomically replaces path with data (str or bytes) unless it already holds exactly that, so
+  unchanged outputs keep their mtime and a crash never leaves a half-written file. Returns
+  whether the file was written."""
+  if isinstance(data, str):
+    data = data.encode('utf-8')
+  digest = hashlib.sha256(data).hexdigest()
+  if is_file_content(path, len(data), digest):
+    return False
+  temp_path = f'{path}.{os.getpid()}.tmp'
+  with open(temp_path, 'wb') as file:
+    file.write(data)
+  os.replace(temp_path, path)
+  record_file_hash(path, digest)
+  return True
+
+class AssetStore:
+  """Content-addressed copies of generated media, hardlinked into the published tree."""
+
+  def __init__(self, path):
+    self.path = path
 
-class Resource:
-  def __init__(self, icon = FontAwesomeIcons.NONE, path = '', name = ''):
-    self.icon = icon
+  def get_object_path(self, digest):
+    return os.path.join(self.path, digest[:2], digest[2:])
+
+  def add(self, source, move = False):
+    """Stores source and returns (object path, how it was stored or None if already present)."""
+    # Temporary files are hashed directly rather than through the source hash cache
+    digest = get_content_hash(source) if move else hash_file(source)
+    object_path = self.get_object_path(digest)
+    if os.path.exists(object_path):
+      if move:
+        os.remove(source)
+      return object_path, None
+
+    # Sources are linked rather than copied, so media that already lives in the
+    # published tree shares its bytes with every generated copy
+    os.makedirs(os.path.dirname(object_path), exist_ok=True)
+    temp_path = f'{object_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    if move:
+      shutil.move(source, temp_path)
+      method = 'move'
+    else:
+      method = link_or_copy(source, temp_path)
+    os.replace(temp_path, object_path)
+    return object_path, method
+
+  def materialize(self, source, dest, move = False):
+    """Makes dest a copy of source and returns the counters describing what was done."""
+    if not move and is_in_sync(source, dest):
+      return ['media up to date']
+
+    object_path, stored = self.add(source, move)
+    events = [f'media stored ({stored})'] if stored else []
+    return events + self.publish(object_path, dest)
+
+  def get_derived_path(self, digest, kind):
+    """Returns where the object made by kind (e.g. 'faststart') from the source with the given hash is kept."""
+    return self.get_object_path(hashlib.sha256(f'{kind}:{digest}'.encode('utf-8')).hexdigest())
+
+  def publish(self, object_path, dest):
+    """Links the stored object to dest unless dest already is that object."""
+    if os.path.exists(dest) and os.path.samefile(object_path, dest):
+      return ['media up to date']
+    temp_path = f'{dest}.{os.getpid()}.{threading.get_ident()}.tmp'
+    method = link_or_copy(object_path, temp_path)
+    os.replace(temp_path, dest)
+    return [f'media published ({method})']
+
+  def collect(self):
+    """Removes objects no longer linked anywhere and returns (objects, links, bytes saved)."""
+    inodes = {}
+    for directory, _, files in os.walk(self.path):
+      for name in files:
+        path = os.path.join(directory, name)
+        inodes.setdefault(os.stat(path).st_ino, []).append(path)
+
+    objects = copies = saved = 0
+    for paths in inodes.values():
+      # A source edited in place leaves several objects sharing one inode; keep
+      # the one whose name still matches the content
+      if len(paths) > 1:
+        current = self.get_object_path(get_content_hash(paths[0]))
+        for path in paths:
+          if path != current:
+            os.remove(path)
+        paths = [path for path in paths if path == current]
+
+      for path in paths:
+        stat = os.stat(path)
+        links = stat.st_nlink - 1
+        if links == 0:
+          os.remove(path)
+          continue
+        objects += 1
+        copies += links
+        saved += stat.st_size * (links - 1)
+    return objects, copies, saved
+
+def get_asset_store():
+  return AssetStore(OPTIONS['asset_store'])
+
+# ioctl request that clones a file's extents on copy-on-write filesystems (btrfs, xfs)
+FICLONE = 0x40049409
+
+def copy_file(source, dest):
+  """Copies source to dest with the cheapest mechanism available and returns its name."""
+  with open(source, 'rb') as source_file, open(dest, 'wb') as dest_file:
+    method = None
+    try:
+      import fcntl
+      fcntl.ioctl(dest_file.fileno(), FICLONE, source_file.fileno())
+      method = 'reflink'
+    except (ImportError, OSError):
+      pass
+
+    if method is None and hasattr(os, 'copy_file_range'):
+      try:
+        remaining = os.fstat(source_file.fileno()).st_size
+        while remaining > 0:
+          copied = os.copy_file_range(source_file.fileno(), dest_file.fileno(), remaining)
+          if copied == 0:
+            break
+          remaining -= copied
+        if remaining == 0:
+          method = 'copy_file_range'
+      except OSError:
+        pass
+
+    if method is None:
+      source_file.seek(0)
+      dest_file.seek(0)
+      dest_file.truncate()
+      shutil.copyfileobj(source_file, dest_file, 1 << 20)
+      method = 'stream'
+
+  # Keep the source mtime so later builds can compare size and mtime cheaply
+  shutil.copystat(source, dest)
+  return method
+
+def link_or_copy(source, dest):
+  try:
+    os.link(source, dest)
+    return 'hardlink'
+  except OSError:
+    return copy_file(source, dest)
+
+def is_in_sync(source, dest):
+  if not os.path.exists(dest):
+    return False
+  if os.path.samefile(source, dest):
+    return True
+  source_stat = os.stat(source)
+  dest_stat = os.stat(dest)
+  if source_stat.st_size != dest_stat.st_size or source_stat.st_mtime_ns != dest_stat.st_mtime_ns:
+    return False
+  return not OPTIONS['verify_media'] or hash_file(source) == get_content_hash(dest)
+
+# Boxes that only contain other boxes, on the way from moov to the chunk offset tables
+MP4_CONTAINERS = {b'moov', b'trak', b'mdia', b'minf', b'stbl', b'edts', b'dinf', b'mvex'}
+
+def read_mp4_boxes(file, start, end):
+  """Yields (type, offset, header size, size) for each box between start and end."""
+  offset = start
+  while offset + 8 <= end:
+    file.seek(offset)
+    size, kind = struct.unpack('>I4s', file.read(8))
+    header_size = 8
+    if size == 1:
+      size = struct.unpack('>Q', file.read(8))[0]
+      header_size = 16
+    elif size == 0:
+      size = end - offset
+    if size < header_size or offset + size > end:
+      raise ValueError(f'corrupt MP4 box {kind!r} at offset {offset}')
+    yield kind, offset, header_size, size
+    offset += size
+
+def iter_mp4_payloads(data):
+  file = io.BytesIO(data)
+  for kind, offset, header_size, size in read_mp4_boxes(file, 0, len(data)):
+    yield kind, data[offset + header_size:offset + size]
+
+def make_mp4_box(kind, payload):
+  if len(payload) + 8 > 0xFFFFFFFF:
+    return struct.pack('>I4sQ', 1, kind, len(payload) + 16) + payload
+  return struct.pack('>I4s', len(payload) + 8, kind) + payload
+
+def read_top_level_mp4_box(file, boxes, kind):
+  for box_kind, offset, header_size, size in boxes:
+    if box_kind == kind:
+      file.seek(offset + header_size)
+      return file.read(size - header_size)
+  return None
+
+def probe_mp4(path):
+  """Returns the duration in seconds and the video size of an MP4 file, or None if it is not one."""
+  try:
+    with open(path, 'rb') as file:
+      boxes = list(read_mp4_boxes(file, 0, os.fstat(file.fileno()).st_size))
+      moov = read_top_level_mp4_box(file, boxes, b'moov')
+  except (OSError, ValueError, struct.error):
+    return None
+  if moov is None:
+    return None
+
+  info = {'duration': None, 'width': None, 'height': None}
+  for kind, payload in iter_mp4_payloads(moov):
+    if kind == b'mvhd':
+      layout = '>20xIQ' if payload[0] == 1 else '>12xII'
+      timescale, duration = struct.unpack_from(layout, payload)
+      if timescale:
+        info['duration'] = duration / timescale
+    elif kind == b'trak':
+      for track_kind, track_payload in iter_mp4_payloads(payload):
+        if track_kind != b'tkhd':
+          continue
+        # Width and height are 16.16 fixed point after the matrix
+        width, height = struct.unpack_from('>II', track_payload, 88 if track_payload[0] == 1 else 76)
+        width, height = width >> 16, height >> 16
+        if width * height > (info['width'] or 0) * (info['height'] or 0):
+          info['width'], info['height'] = width, height
+  return info
+
+def patch_chunk_offsets(data, shift, use_co64):
+  """Returns the boxes in data with every chunk offset passed through shift."""
+  boxes = []
+  for kind, payload in iter_mp4_payloads(data):
+    if kind in MP4_CONTAINERS:
+      payload = patch_chunk_offsets(payload, shift, use_co64)
+    elif kind in (b'stco', b'co64'):
+      count = struct.unpack_from('>I', payload, 4)[0]
+      offsets = struct.unpack_from(f'>{count}{"I" if kind == b"stco" else "Q"}', payload, 8)
+      offsets = [shift(offset) for offset in offsets]
+      if kind == b'stco' and (use_co64 or any(offset > 0xFFFFFFFF for offset in offsets)):
+        if not use_co64:
+          raise OverflowError('chunk offsets need 64 bits')
+        kind = b'co64'
+      payload = payload[:8] + struct.pack(f'>{count}{"I" if kind == b"stco" else "Q"}', *offsets)
+    boxes.append(make_mp4_box(kind, payload))
+  return b''.join(boxes)
+
+def copy_byte_range(source, dest, start, length, block_size = 1 << 20):
+  source.seek(start)
+  while length > 0:
+    block = source.read(min(block_size, length))
+    if not block:
+      raise ValueError('unexpected end of file')
+    dest.write(block)
+    length -= len(block)
+
+def make_faststart(source, dest):
+  """Writes source to dest with moov moved in front of mdat. Returns False if it already is,
+  or if source is not an MP4 file this can rewrite."""
+  with open(source, 'rb') as source_file:
+    end = os.fstat(source_file.fileno()).st_size
+    try:
+      boxes = list(read_mp4_boxes(source_file, 0, end))
+    except (ValueError, struct.error):
+      return False
+    kinds = [box[0] for box in boxes]
+    if b'moov' not in kinds or b'mdat' not in kinds or kinds.index(b'moov') < kinds.index(b'mdat'):
+      return False
+    _, moov_start, moov_header_size, moov_size = boxes[kinds.index(b'moov')]
+    insert_at = boxes[kinds.index(b'mdat')][1]
+    source_file.seek(moov_start + moov_header_size)
+    moov = source_file.read(moov_size - moov_header_size)
+
+    # Data between the first mdat and the old moov moves down by the size of the new
+    # moov; data after the old moov moves by the difference in size
+    def patch(use_co64):
+      new_size = len(make_mp4_box(b'moov', patch_chunk_offsets(moov, lambda offset: offset, use_co64)))
+      def shift(offset):
+        if insert_at <= offset < moov_start:
+          return offset + new_size
+        if offset >= moov_start + moov_size:
+          return offset + new_size - moov_size
+        return offset
+      return make_mp4_box(b'moov', patch_chunk_offsets(moov, shift, use_co64))
+
+    try:
+      try:
+        new_moov = patch(False)
+      except OverflowError:
+        new_moov = patch(True)
+    except (ValueError, struct.error):
+      return False
+
+    with open(dest, 'wb') as dest_file:
+      copy_byte_range(source_file, dest_file, 0, insert_at)
+      dest_file.write(new_moov)
+      copy_byte_range(source_file, dest_file, insert_at, moov_start - insert_at)
+      copy_byte_range(source_file, dest_file, moov_start + moov_size, end - moov_start - moov_size)
+  return True
+
+def faststart_in_place(path):
+  temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+  if not make_faststart(path, temp_path):
+    return False
+  os.replace(temp_path, path)
+  return True
+
+def needs_faststart(path):
+  try:
+    with open(path, 'rb') as file:
+      kinds = [box[0] for box in read_mp4_boxes(file, 0, os.fstat(file.fileno()).st_size)]
+  except (ValueError, struct.error):
+    return False
+  return b'moov' in kinds and b'mdat' in kinds and kinds.index(b'moov') > kinds.index(b'mdat')
+
+def publish_media(store, source, dest):
+  # Videos with their index at the end are published with it moved to the front so
+  # browsers can start playback before the whole file has downloaded
+  if (OPTIONS['faststart'] and source.lower().endswith(('.mp4', '.m4v', '.mov'))
+      and needs_faststart(source)):
+    # The rewritten copy is stored under the hash of its source: its bytes differ from the
+    # source, so it cannot be checked against it by size and mtime
+    object_path = store.get_derived_path(hash_file(source), 'faststart')
+    events = []
+    if not os.path.exists(object_path):
+      os.makedirs(os.path.dirname(object_path), exist_ok=True)
+      temp_path = f'{object_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+      if make_faststart(source, temp_path):
+        os.replace(temp_path, object_path)
+        events.append('videos made faststart')
+    if os.path.exists(object_path):
+      return events + store.publish(object_path, dest)
+
+  if is_in_sync(source, dest):
+    return ['media up to date']
+  return store.materialize(source, dest)
+
+def sync_media(pairs):
+  """Publishes each (source, dest) pair through the asset store on a bounded thread pool."""
+  store = get_asset_store()
+  with ThreadPoolExecutor(max_workers=OPTIONS['media_jobs']) as pool:
+    for events in pool.map(lambda pair: publish_media(store, *pair), pairs):
+      STATS.update(events)
+
+def get_video_size_attributes(path, default = ''):
+  info = probe_mp4(path) if os.path.isfile(path) else None
+  if not info or not info['width']:
+    return default
+  attributes = f' width="{info["width"]}" height="{info["height"]}"'
+  if info['duration']:
+    attributes += f' data-duration="{info["duration"]:.3f}"'
+  return attributes
+
+class HtmlWriter:
+  """Streams a page into a temp file that replaces path on close, unless path already holds the
+  same bytes; a page that fails to render leaves the previous one in place."""
+
+  def __init__(self, path, buffer_size = 1 << 16):
     self.path = path
-    self.name = name
+    self.temp_path = f'{path}.{os.getpid()}.tmp'
+    self.file = open(self.temp_path, 'wb')
+    self.digest = hashlib.sha256()
+    self.written = 0
+    self.buffer_size = buffer_size
+    self.chunks = []
+    self.size = 0
+
+  def write(self, chunk):
+    self.chunks.append(chunk)
+    self.size += len(chunk)
+    if self.size >= self.buffer_size:
+      self.flush()
+
+  def flush(self):
+    data = ''.join(self.chunks).encode('utf-8')
+    self.digest.update(data)
+    self.written += len(data)
+    self.file.write(data)
+    self.chunks = []
+    self.size = 0
+
+  def close(self):
+    self.flush()
+    self.file.close()
+    digest = self.digest.hexdigest()
+    if is_file_content(self.path, self.written, digest):
+      os.remove(self.temp_path)
+      return
+    os.replace(self.temp_path, self.path)
+    record_file_hash(self.path, digest)
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, *exc_info):
+    if exc_type is None:
+      self.close()
+    else:
+      self.file.close()
+      os.remove(self.temp_path)
+
+# Elements that start a new line, so whitespace next to their tags never renders
+HTML_BLOCK_ELEMENTS = {
+  'address', 'article', 'aside', 'blockquote', 'body', 'br', 'dd', 'details', 'div', 'dl', 'dt',
+  'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+  'head', 'header', 'hr', 'html', 'li', 'link', 'main', 'meta', 'nav', 'ol', 'p', 'pre',
+  'section', 'table', 'tbody', 'td', 'tfoot', 'th', 'thead', 'title', 'tr', 'ul',
+}
+HTML_VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+# Elements copied verbatim, tags included
+HTML_RAW_ELEMENTS = {'pre', 'script', 'style', 'textarea'}
+
+HTML_SPACE = re.compile(r'[ \t\n\r\f]+')
+HTML_TAG = re.compile(r'''<(/?)([a-zA-Z][a-zA-Z0-9-]*)((?:\s+[^\s"'>/=]+(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s"'<>`]+))?)*)\s*(/?)>''')
+HTML_ATTRIBUTE = re.compile(r'''([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'<>`]+)))?''')
+
+def minify_tag(closing, name, attributes, self_closing):
+  # Void elements drop the redundant slash; foreign ones like <path/> need it
+  keep_slash = self_closing and name.lower() not in HTML_VOID_ELEMENTS
+  attributes = list(HTML_ATTRIBUTE.finditer(attributes))
+  parts = [f'<{closing}{name}']
+  for index, attribute in enumerate(attributes):
+    value = next((value for value in attribute.groups()[1:] if value is not None), None)
+    if value is None:
+      parts.append(f' {attribute.group(1)}')
+    elif re.fullmatch(r'''[^\s"'=<>`]+''', value) and not (keep_slash and index == len(attributes) - 1):
+      parts.append(f' {attribute.group(1)}={value}')
+    else:
+      quote = "'" if '"' in value else '"'
+      parts.append(f' {attribute.group(1)}={quote}{value}{quote}')
+  parts.append('/>' if keep_slash else '>')
+  return ''.join(parts)
+
+class HtmlMinifier:
+  """Collapses whitespace, drops comments and redundant attribute quotes from html fed in chunks."""
+
+  def __init__(self):
+    self.buffer = ''
+    self.raw_end = None
+    self.space = False
+    self.after_block = True
+
+  def feed(self, chunk, final = False):
+    """Returns the minified html for the input up to the last complete token."""
+    buffer = self.buffer + chunk
+    out = []
+    position = 0
+    while position < len(buffer):
+      if self.raw_end:
+        match = self.raw_end.search(buffer, position)
+        if match is None:
+          # Hold back enough to find a closing tag split across chunks
+          end = len(buffer) if final else max(position, len(buffer) - 16)
+          out.append(buffer[position:end])
+          position = end
+          break
+        out.append(buffer[position:match.end()])
+        position = match.end()
+        self.raw_end = None
+        continue
+
+      start = buffer.find('<', position)
+      if start != position:
+        end = len(buffer) if start == -1 else start
+        self.text(buffer[position:end], out)
+        position = end
+        continue
+
+      if buffer.startswith('<!--', position):
+        end = buffer.find('-->', position + 4)
+        if end == -1 and not final:
+          break
+        position = len(buffer) if end == -1 else end + 3
+        continue
+      if buffer.startswith(('<!', '<?'), position):
+        end = buffer.find('>', position)
+        if end == -1 and not final:
+          break
+        end = len(buffer) if end == -1 else end + 1
+        out.append(buffer[position:end])
+        self.space = False
+        self.after_block = True
+        position = end
+        continue
+
+      match = HTML_TAG.match(buffer, position)
+      if match:
+        self.tag(match, out)
+        position = match.end()
+      elif not final:
+        # The tag may be completed by the next chunk
+        break
+      else:
+        self.text('<', out)
+        position += 1
+
+    self.buffer = buffer[position:]
+    return ''.join(out)
+
+  def close(self):
+    return self.feed('', final=True)
+
+  def text(self, text, out):
+    text = HTML_SPACE.sub(' ', text)
+    if text.startswith(' '):
+      self.space = True
+      text = text[1:]
+    if not text:
+      return
+    trailing = text.endswith(' ')
+    if trailing:
+      text = text[:-1]
+    if self.space and not self.after_block:
+      out.append(' ')
+    out.append(text)
+    self.space = trailing
+    self.after_block = False
+
+  def tag(self, match, out):
+    closing, name, attributes, self_closing = match.groups()
+    block = name.lower() in HTML_BLOCK_ELEMENTS
+    if self.space and not block and not self.after_block:
+      out.append(' ')
+    self.space = False
+    self.after_block = block
+    if name.lower() in HTML_RAW_ELEMENTS:
+      out.append(match.group(0))
+      if not closing:
+        self.raw_end = re.compile(r'</%s\s*>' % name.lower(), re.I)
+      return
+    out.append(minify_tag(closing, name, attributes, self_closing))
+
+def minify_html(html):
+  minifier = HtmlMinifier()
+  return minifier.feed(html) + minifier.close()
+
+TEMPLATE_SOURCES = {
+  'page': '<!DOCTYPE html>\n<html>{head}<body>{body}{service_worker}</body></html>',
+
+  'head': '<head><meta charset="UTF-8"/>{stylesheets}</head>',
+
+  'stylesheet': '<link rel="stylesheet" type="text/css" href="{href}"/>',
+
+  'icon': '<i class="{icon}"></i>',
+
+  'svg_icon': '<svg class="icon" width="{width}em" height="1em" viewBox="{x} 0 {box} 1792" fill="currentColor" aria-hidden="true" style="vertical-align:-0.142857em"><path transform="matrix(1 0 0 -1 0 1536)" d="{path}"/></svg>',
+
+  'nav': '''
+        <nav class="navbar navbar-expand-lg">
+          <div class="container-fluid">
+            <ul class="navbar-nav ml-auto">
+              <li class="nav-item"> 
+                <a href="../../">
+                {icon}
+                {label}
+                </a>
+              </li>
+            </ul>
+          </div>
+        </nav>''',
 
-class Course:
-  def __init__(self, image, name, url, role, details):
-    self.image = image
-    self.name = name
-    self.url = url
-    self.role = role
-    self.details = details
+  'section': '''
+      <div>
+        <h2 class="mt-4 font-weight-normal">{name}</h2>
+        <hr>
+        {content}
+      </div>
+    ''',
 
-class Video:
-  def __init__(self, name, id):
-    self.name = name
-    self.id = id
+  'resources_list': '''
+      <div>
+        <h4 class="mt-4 font-weight-light">
+          {name}
+        </h4>
+        {resources}
+      </div>
+    ''',
 
-class AboutMe:
-  def __init__(self, name, image, resources):
-    self.name = name
-    self.image = image
-    self.resources = resources
+  'resource': '''
+        <div class="container mt-1 mb-1">
+          {icon}
+          <a href="{path}">
+            {name}
+          </a>
+        </div>
+        ''',
 
-  def get_html(self):
-    links = ''
-    for resource in self.resources:
-      links += f'''
+  'profile_link': '''
         <div class="d-block profile-row">
-          <i class="{resource.icon}"></i>
+          {icon}
           <a
             class="pl-2"
-            href="{resource.path}"
+            href="{path}"
           >
-            {resource.name}
+            {name}
           </a>
         </div>
-      '''
-    return f'''
+      ''',
+
+  'about_me': '''
       <div class="d-flex pl-5 pt-5 justify-content-start">
         <div>
           <img
             id="profile-pic"
             class="float-left"
-            src="{self.image}"
+            src="{image}"
             alt="Bailey"
           />
         </div>
         <div class="col">
           <div class="d-block profile-row">
-            <h1>{self.name}</h1>
+            <h1>{name}</h1>
           </div>
           {links}
         </div>
       </div>
-    '''
-
-class Home:
-  def __init__(self, about_me, bio, publications = [], courses = [], ongoing_projects=[]):
-    self.about_me = about_me
-    self.bio = bio
-    self.publications = publications 
-    self.courses = courses
-    self.ongoing_projects = ongoing_projects
-    
-  def get_ongoing_projects_html(self):
-    project_list = ''
-    for project in self.ongoing_projects:
-        # Use main image if defined, else first image from the list, else use placeholder
-        thumbnail = project.image or (project.images[0] if project.images else 'assets/default_placeholder.png')
-
-        # Optionally display a video icon if videos exist
-        video_icon = '<i class="fas fa-video ml-2"></i>' if project.videos else ''
-
-        project_list += f'''
-            <div>
-                <div class="d-flex flex-row pb-4 align-items-center">
-                    <img
-                        src="{thumbnail}"
-                        class="thumbnail img-responsive"
-                        style="max-width: 150px; height: auto;"
-                    />
-                    <div class="d-flex flex-column pl-4">
-                        <span>
-                            <a href="{project.url}" class="item-title">{project.title}{video_icon}</a>
-                        </span>
-                    </div>
-                </div>
-            </div>
-        '''
-    return project_list
+    ''',
 
+  'thumbnail': '<img src="{src}" {attributes}/>',
 
-  
+  'responsive_thumbnail': '''<picture>
+              <source type="image/webp" srcset="{webp_srcset}" sizes="{sizes}">
+              <img src="{src}" srcset="{srcset}" sizes="{sizes}" {attributes}/>
+            </picture>''',
 
-  def get_publications_list_html(self):
-    pub_list = ''
-    for _, pub in self.publications.items():
-      pub_award_text = f'''<div class="paper-award">{pub.award}</div>'''
-      pub_list += f'''
+  'publication_item': '''
         <div>
           <div class="d-flex flex-row pb-4 align-items-center">
-            <img
-              src={pub.image}
-              class="thumbnail img-responsive"
-            />
+            {image}
             <div class="d-flex flex-column pl-4">
               <span>
-                <a href={pub.url} class="item-title">{pub.title}</a>
+                <a href="{url}" class="item-title">{title}</a>
               </span>
               <div>
-                {pub.get_author_names()}
+                {authors}
               </div>
               <div>
-                {pub.venue}
+                {venue}
               </div>
               <div>
-                {pub_award_text if pub.award else ''}
+                {award}
               </div>
             </div>
           </div>
         </div>
-      '''
-    return pub_list
+      ''',
 
-  def get_teaching_list_html(self):
-    teaching_list = ''
-    for course in self.courses:
-      teaching_list += f'''
+  'course_item': '''
         <div>
           <div class="d-flex flex-row pb-4 align-items-center">
-            <img
-              src={course.image}
-              class="thumbnail img-responsive"
-            />
+            {image}
             <div class="d-flex flex-column pl-4">
               <span>
-                <a href={course.url} class="item-title">{course.name}</a>
+                <a href="{url}" class="item-title">{name}</a>
               </span>
               <div>
-                <b>{course.role}</b>
+                <b>{role}</b>
               </div>
               <div>
-                {course.details}
+                {details}
               </div>
             </div>
           </div>
         </div>
-      '''
-    return teaching_list
-  def generate(self, path):
-    soup = BeautifulSoup('<!DOCTYPE html> <html></html>', 'html.parser')
+      ''',
 
-    # Add styling 
-    head = soup.new_tag('head')
-    soup.html.append(head)
+  'ongoing_item': '''
+            <div>
+                <div class="d-flex flex-row pb-4 align-items-center">
+                    {image}
+                    <div class="d-flex flex-column pl-4">
+                        <span>
+                            <a href="{url}" class="item-title">{title}{video_icon}</a>
+                        </span>
+                    </div>
+                </div>
+            </div>
+        ''',
 
-    head.append(soup.new_tag('meta', charset="UTF-8"))
-    links = [
-        soup.new_tag('link', rel='stylesheet', type='text/css', 
-                     href=os.path.join('assets', style_asset))
-        for style_asset in STYLE_ASSETS
-    ]
-    [head.append(link) for link in links]
-
-    # Construct page
-    body = soup.new_tag('body')
-    soup.html.append(body)
-    about_me_section = self.about_me.get_html()
-    publications_list = self.get_publications_list_html()
-    ongoing_projects_list = self.get_ongoing_projects_html()  
-    teaching_list = self.get_teaching_list_html()
-    body.append(BeautifulSoup(f''' 
+  'home': ''' 
       <div class="container">
-        {about_me_section} 
+        {about_me} 
       </div>
       <div class="container">
         <div class="d-flex flex-column pl-5 pt-3">
           <div>
-            <p>{self.bio}</p>
-          </div>
+            <p>{bio}</p>
+          </div>{search}
           <div>
             <h4>Publications</h4>
             <hr/>
-            {publications_list}
+            {publications}
             <div class="pb-5"></div>
             </div>
             <div>
               <h4>Ongoing Projects</h4>
               <hr/>
-              {ongoing_projects_list} 
+              {ongoing_projects} 
              </div>
              <div>
             <h4>Teaching</h4>
             <hr/>
-            {teaching_list}
+            {teaching}
           </div>
         </div>
         <br>
         <div class="text-center">
           <h6 class="font-weight-light"> 
-            Source code for this website is <a href=https://github.com/meherniger24>available on Github</a>
+            Source code for this website is <a href="https://github.com/meherniger24">available on Github</a>
           </h6>
         </div>
       </div>
-    ''', 'html.parser'))
-    with open(os.path.join(path, 'index.html'), "w", encoding="utf-8") as file:
-        file.write(str(soup))
-
-class OngoingProject:
-    def __init__(self, image='', title='', url='', details=[], videos=[], images=[]):
-        self.image = image  # Main preview image (optional)
-        self.title = title
-        self.url = url
-        self.details = details  # List of description points
-        self.videos = videos    # List of video paths
-        self.images = images    # List of image paths
+    ''',
 
-    def generate(self, path):
-        """Generates the HTML for this project."""
-        # Convert details into a bulleted list
-        details_html = '<ul>'
-        for detail in self.details:
-            details_html += f'<li>{detail}</li>'
-        details_html += '</ul>'
-
-        # Render videos
-        videos_html = ''
-        for video in self.videos:
-            videos_html += f'''
+  'ongoing_image': '''
+                <div class="mt-3 mb-3">
+                    <h4 class="font-weight-light">Image</h4>
+                    <img src="{src}" alt="Project image" style="max-width: 100%; height: auto;" class="img-fluid">
+                </div>
+            ''',
+
+  'ongoing_video': '''
                 <div class="mt-3 mb-3">
                     <h4 class="font-weight-light">Video</h4>
-                    <video controls class="embed-responsive-item project-video" style="max-width: 100%; height: auto;">
-                        <source src="{video}" type="video/mp4">
+                    <video controls class="embed-responsive-item project-video" style="max-width: 100%; height: auto;"{size}{attributes}>
+                        <source src="{src}" type="video/mp4">
                         Your browser does not support the video tag.
                     </video>
                 </div>
-            '''
+            ''',
 
-        # Render additional images
-        images_html = ''
-        for img in self.images:
-            images_html += f'''
-                <div class="mt-3 mb-3">
-                    <h4 class="font-weight-light">Image</h4>
-                    <img src="{img}" alt="Project image" style="max-width: 100%; height: auto;" class="img-fluid">
-                </div>
-            '''
-
-        # Use BeautifulSoup to build HTML
-        soup = BeautifulSoup('<!DOCTYPE html> <html></html>', 'html.parser')
-
-        head = soup.new_tag('head')
-        soup.html.append(head)
-        head.append(soup.new_tag('meta', charset="UTF-8"))
-        links = [
-            soup.new_tag('link', rel='stylesheet', type='text/css',
-                         href=os.path.join('../../assets', style_asset))
-            for style_asset in STYLE_ASSETS
-        ]
-        [head.append(link) for link in links]
-
-        body = soup.new_tag('body')
-        soup.html.append(body)
-        body.append(BeautifulSoup(f'''
-            <div class="container">
-                <nav class="navbar navbar-expand-lg">
-                    <div class="container-fluid">
-                        <ul class="navbar-nav ml-auto">
-                            <li class="nav-item"> 
-                                <a href="../../">
-                                <i class="{FontAwesomeIcons.BACK_ARROW}"></i>
-                                Home
-                                </a>
-                            </li>
-                        </ul>
-                    </div>
-                </nav>
-                <h1 class="card-title font-weight-normal">{self.title}</h1>
+  'ongoing': '''
+      <div class="container">{nav}
+        <h1 class="card-title font-weight-normal">{title}</h1>
+
+        <h4>Description:</h4>
+        <ul>{details}</ul>
+        {images}
+        {videos}
+      </div>
+      {video_loader}
+    ''',
 
-                <h4>Description:</h4>
-                {details_html}
-                {images_html}
-                {videos_html}
+  'project_video': '''
+            <div class="col-md-6">
+                <h4 class="font-weight-light">{name}</h4>
+                <video controls class="embed-responsive-item project-video"{size}{attributes}>
+                    <source src="{src}" type="video/mp4">
+                    Your browser does not support the video tag.
+                </video>
             </div>
-        ''', 'html.parser'))
+        ''',
+
+  'search': '''
+          <div class="pb-4" data-search-index="{index}">
+            <input type="search" class="form-control" placeholder="Search publications and projects" aria-label="Search publications and projects">
+            <ul class="list-unstyled pt-2 mb-0"></ul>
+          </div>
+          <script>
+            (function() {{
+              var widget = document.querySelector("[data-search-index]");
+              var input = widget.querySelector("input");
+              var results = widget.querySelector("ul");
+              var index = null;
+
+              // The index is only downloaded once the visitor starts searching
+              function load() {{
+                index = index || fetch(widget.getAttribute("data-search-index")).then(function(response) {{
+                  return response.json();
+                }}).then(function(data) {{
+                  var term = "";
+                  data.terms = data.terms.map(function(entry) {{
+                    return term = term.slice(0, entry[0]) + entry[1];
+                  }});
+                  data.postings = data.postings.map(function(deltas) {{
+                    var id = 0;
+                    return deltas.map(function(delta) {{ return id += delta; }});
+                  }});
+                  return data;
+                }});
+                return index;
+              }}
+
+              // Every term starting with the token matches, so "segment" finds "segmentation"
+              function lookup(data, token) {{
+                var low = 0, high = data.terms.length, found = {{}};
+                while (low < high) {{
+                  var middle = (low + high) >> 1;
+                  if (data.terms[middle] < token) {{
+                    low = middle + 1;
+                  }} else {{
+                    high = middle;
+                  }}
+                }}
+                for (; low < data.terms.length && data.terms[low].lastIndexOf(token, 0) === 0; low++) {{
+                  data.postings[low].forEach(function(id) {{ found[id] = true; }});
+                }}
+                return found;
+              }}
+
+              function search() {{
+                var query = input.value;
+                var tokens = query.toLowerCase().match(/[\\p{{L}}\\p{{N}}]+/gu) || [];
+                load().then(function(data) {{
+                  if (query !== input.value) {{
+                    return;
+                  }}
+                  var matches = data.docs.map(function(_, id) {{ return id; }});
+                  tokens.forEach(function(token) {{
+                    var found = lookup(data, token);
+                    matches = matches.filter(function(id) {{ return found[id]; }});
+                  }});
+                  results.textContent = "";
+                  if (!tokens.length) {{
+                    return;
+                  }}
+                  matches.slice(0, 10).forEach(function(id) {{
+                    var item = document.createElement("li");
+                    var link = document.createElement("a");
+                    link.href = data.docs[id][1];
+                    link.textContent = data.docs[id][0];
+                    item.appendChild(link);
+                    results.appendChild(item);
+                  }});
+                  if (!matches.length) {{
+                    var item = document.createElement("li");
+                    item.className = "text-muted";
+                    item.textContent = "No results";
+                    results.appendChild(item);
+                  }}
+                }});
+              }}
+
+              input.addEventListener("focus", load);
+              input.addEventListener("input", search);
+            }})();
+          </script>''',
+
+  'person': '''
+      <div class="container">{nav}
+        <div class="d-flex flex-column pl-5 pt-3">
+          <h1 class="font-weight-normal">{name}</h1>{website}
+          <h4 class="pt-3">Publications</h4>
+          <hr/>
+          {publications}
+          <h4 class="pt-3">Co-authors</h4>
+          <hr/>
+          <ul class="pb-5">{coauthors}</ul>
+        </div>
+      </div>
+    ''',
+
+  'person_website': '<a href="{url}">{url}</a>',
+
+  'coauthor_item': '<li><a href="{url}">{name}</a> ({count} shared {papers})</li>',
+
+  'listing_items': '<div data-listing-items="{section}">{items}</div>',
 
-        # Save the HTML file
-        if not os.path.exists(path):
-            os.makedirs(path)
-        with open(os.path.join(path, 'index.html'), "w", encoding="utf-8") as file:
-            file.write(str(soup))
+  'listing_more': '''
+            <div class="pb-4">
+              <a class="listing-more" href="{href}"{index}>More {label}</a>
+            </div>''',
 
+  'listing_link': '<a class="p-2" href="{href}">{label}</a>',
+
+  'listing_page': '''
+      <div class="container">{nav}
+        <div class="d-flex flex-column pl-5 pt-3">
+          <h4>{heading}</h4>
+          <hr/>
+          {items}
+          <div class="d-flex justify-content-between pb-5">{pager}</div>
+        </div>
+      </div>
+    ''',
+
+  'listing_loader': '''
+    <script>
+      document.addEventListener("click", function(event) {{
+        var link = event.target.closest("a[data-listing-index]");
+        if (!link || !window.fetch || !window.DOMParser) {{
+          return;
+        }}
+        // Append the items of the next page instead of leaving the home page
+        event.preventDefault();
+        var list = link.parentNode.previousElementSibling;
+        var index = new URL(link.getAttribute("data-listing-index"), location.href);
+        var pages = link.listingPages || fetch(index).then(function(response) {{ return response.json(); }});
+        link.listingPages = pages;
+        pages.then(function(data) {{
+          var next = link.listingNext || 0;
+          var url = new URL(data.pages[next], index);
+          return fetch(url).then(function(response) {{ return response.text(); }}).then(function(html) {{
+            var items = new DOMParser().parseFromString(html, "text/html").querySelector("[data-listing-items]");
+            items.querySelectorAll("[href], [src], [srcset]").forEach(function(element) {{
+              ["href", "src"].forEach(function(name) {{
+                if (element.hasAttribute(name)) {{
+                  element.setAttribute(name, new URL(element.getAttribute(name), url).href);
+                }}
+              }});
+              if (element.hasAttribute("srcset")) {{
+                element.setAttribute("srcset", element.getAttribute("srcset").split(",").map(function(candidate) {{
+                  var parts = candidate.trim().split(/\\s+/);
+                  parts[0] = new URL(parts[0], url).href;
+                  return parts.join(" ");
+                }}).join(", "));
+              }}
+            }});
+            while (items.firstChild) {{
+              list.appendChild(items.firstChild);
+            }}
+            link.listingNext = next + 1;
+            if (link.listingNext >= data.pages.length) {{
+              link.parentNode.remove();
+            }} else {{
+              link.href = new URL(data.pages[link.listingNext], index).href;
+            }}
+          }});
+        }}).catch(function() {{
+          location.href = link.href;
+        }});
+      }});
+    </script>
+    ''',
+
+  'project_videos': '<div class="container"><h2 class="mt-4 font-weight-normal">Visualization</h2><hr>{rows}</div>',
+
+  'video_loader': '''
+    <script>
+      document.addEventListener("DOMContentLoaded", function() {{
+        var videos = document.querySelectorAll("video[data-lazy-video]");
+        if (!("IntersectionObserver" in window)) {{
+          return;
+        }}
+        // Videos are not fetched until play() is called, which only happens once they are in view
+        var observer = new IntersectionObserver(function(entries) {{
+          entries.forEach(function(entry) {{
+            if (entry.isIntersecting) {{
+              entry.target.play().catch(function() {{}});
+            }} else if (!entry.target.paused) {{
+              entry.target.pause();
+            }}
+          }});
+        }}, {{threshold: 0.25}});
+        videos.forEach(function(video) {{
+          observer.observe(video);
+        }});
+      }});
+    </script>
+    ''',
+
+  'service_worker_registration':
+    '<script>if ("serviceWorker" in navigator) {{ navigator.serviceWorker.register("{path}"); }}</script>',
+
+  'service_worker': '''// Written by generate.py from {manifest}; do not edit
+var VERSION = "{version}";
+var SCOPE = self.registration.scope;
+var MANIFEST = new URL("{manifest}", SCOPE).href;
+var PRECACHE = "precache " + SCOPE;
+var VIDEO_CACHE = "videos " + SCOPE;
+var MAX_VIDEOS = {max_videos};
+var BLOCK_SIZE = {block_size};
+var VIDEO = /\\.({video_extensions})$/i;
+// The manifest of the installed files, diffed against the manifest of the next deploy
+var INSTALLED = MANIFEST + "?installed";
+
+function getUrl(path) {{
+  return new URL(path, SCOPE).href;
+}}
+
+function getVideoUrl(request) {{
+  return request.url.split("?")[0];
+}}
+
+function getBlockUrl(url, block) {{
+  return url.split("?")[0] + "?block=" + block;
+}}
+
+self.addEventListener("install", function(event) {{
+  event.waitUntil(Promise.all([
+    caches.open(PRECACHE),
+    caches.open(VIDEO_CACHE),
+    fetch(MANIFEST + "?v=" + VERSION, {{cache: "no-cache"}}).then(function(response) {{ return response.json(); }})
+  ]).then(function(results) {{
+    var cache = results[0], videos = results[1], manifest = results[2];
+    return cache.match(INSTALLED).then(function(response) {{
+      return response ? response.json() : {{files: {{}}, runtime: {{}}}};
+    }}).then(function(installed) {{
+      // Only files whose content hash changed are downloaded again; removed ones are dropped
+      var downloads = Object.keys(manifest.files).filter(function(path) {{
+        return installed.files[path] !== manifest.files[path];
+      }}).map(function(path) {{
+        return fetch(getUrl(path), {{cache: "no-cache"}}).then(function(response) {{
+          if (!response.ok) {{
+            throw new Error(path + ": " + response.status);
+          }}
+          return cache.put(getUrl(path), response);
+        }});
+      }});
+      var removals = Object.keys(installed.files).filter(function(path) {{
+        return !(path in manifest.files);
+      }}).map(function(path) {{
+        return cache.delete(getUrl(path));
+      }});
+      var changedVideos = Object.keys(installed.runtime).filter(function(path) {{
+        return installed.runtime[path] !== manifest.runtime[path];
+      }}).map(getUrl);
+      var staleVideos = videos.keys().then(function(requests) {{
+        return Promise.all(requests.filter(function(request) {{
+          return changedVideos.indexOf(getVideoUrl(request)) >= 0;
+        }}).map(function(request) {{
+          return videos.delete(request);
+        }}));
+      }});
+      return Promise.all(downloads.concat(removals, [staleVideos]));
+    }}).then(function() {{
+      return cache.put(INSTALLED, new Response(JSON.stringify(manifest)));
+    }});
+  }}).then(function() {{
+    return self.skipWaiting();
+  }}));
+}});
+
+self.addEventListener("activate", function(event) {{
+  event.waitUntil(self.clients.claim());
+}});
+
+self.addEventListener("fetch", function(event) {{
+  var request = event.request;
+  var url = new URL(request.url);
+  if (request.method !== "GET" || request.url.indexOf(SCOPE) !== 0 || request.url === INSTALLED) {{
+    return;
+  }}
+  if (VIDEO.test(url.pathname)) {{
+    event.respondWith(getVideo(event));
+    return;
+  }}
+  event.respondWith(caches.open(PRECACHE).then(function(cache) {{
+    return cache.match(request, {{ignoreSearch: true}}).then(function(response) {{
+      if (response || request.mode !== "navigate" || /(\\/|\\.[^\\/]*)$/.test(url.pathname)) {{
+        return response || fetch(request);
+      }}
+      // Pages are linked without their trailing slash; redirect to the precached page like the server would
+      url.pathname += "/";
+      return cache.match(url.href, {{ignoreSearch: true}}).then(function(page) {{
+        return page ? Response.redirect(url.href, 301) : fetch(request);
+      }});
+    }});
+  }}));
+}});
+
+// Videos are read in byte ranges as they play. The bytes the network sends are passed through
+// and stored in blocks of BLOCK_SIZE, so only what the page actually read is cached (a metadata
+// preload stores at most its first block), and a later range starting in a stored block (seeking,
+// looping, revisits) is answered from it; the browser asks again for the bytes that follow
+function getVideo(event) {{
+  var request = event.request;
+  var range = /^bytes=(\\d+)-(\\d*)$/.exec(request.headers.get("Range") || "");
+  if (!range) {{
+    return fetch(request);
+  }}
+  var start = Number(range[1]);
+  var end = range[2] ? Number(range[2]) : Infinity;
+  var block = Math.floor(start / BLOCK_SIZE);
+  return caches.open(VIDEO_CACHE).then(function(cache) {{
+    return cache.match(getBlockUrl(request.url, block)).then(function(cached) {{
+      if (cached) {{
+        return getRange(cached, block * BLOCK_SIZE, start, end);
+      }}
+      return fetch(request).then(function(response) {{
+        var served = /^bytes (\\d+)-\\d+\\/(\\d+)$/.exec(response.headers.get("Content-Range") || "");
+        if (response.status !== 206 || !served || !response.body) {{
+          return response;
+        }}
+        var body = cacheBlocks(event, cache, request.url, response, Number(served[1]), Number(served[2]));
+        return new Response(body, {{status: 206, statusText: response.statusText, headers: response.headers}});
+      }});
+    }});
+  }});
+}}
+
+function getRange(response, offset, start, end) {{
+  var size = Number(/\\/(\\d+)$/.exec(response.headers.get("Content-Range"))[1]);
+  return response.blob().then(function(blob) {{
+    var last = Math.min(offset + blob.size, end + 1) - 1;
+    if (start > last) {{
+      return new Response(null, {{status: 416, headers: {{"Content-Range": "bytes */" + size}}}});
+    }}
+    return new Response(blob.slice(start - offset, last + 1 - offset), {{
+      status: 206,
+      headers: {{
+        "Content-Type": response.headers.get("Content-Type") || "video/mp4",
+        "Content-Range": "bytes " + start + "-" + last + "/" + size,
+        "Content-Length": String(last + 1 - start)
+      }}
+    }});
+  }});
+}}
+
+function cacheBlocks(event, cache, url, response, offset, size) {{
+  var reader = response.body.getReader();
+  var type = response.headers.get("Content-Type") || "video/mp4";
+  var block = Math.ceil(offset / BLOCK_SIZE);
+  var parts = [];
+  var position = offset;
+  var writes = [];
+  var finish;
+  // Keeps the worker alive until the blocks read so far are stored
+  event.waitUntil(new Promise(function(resolve) {{
+    finish = function() {{
+      resolve(Promise.all(writes).then(function() {{
+        return trimCache(cache, MAX_VIDEOS);
+      }}).catch(function() {{}}));
+    }};
+  }}));
+
+  function collect(chunk) {{
+    var chunkStart = position;
+    position += chunk.length;
+    var begin = Math.max(chunkStart, block * BLOCK_SIZE);
+    while (begin < position) {{
+      var blockEnd = Math.min((block + 1) * BLOCK_SIZE, size);
+      var stop = Math.min(position, blockEnd);
+      parts.push(chunk.subarray(begin - chunkStart, stop - chunkStart));
+      begin = stop;
+      if (stop === blockEnd) {{
+        var blob = new Blob(parts);
+        var blockStart = block * BLOCK_SIZE;
+        writes.push(cache.put(getBlockUrl(url, block), new Response(blob, {{headers: {{
+          "Content-Type": type,
+          "Content-Range": "bytes " + blockStart + "-" + (blockStart + blob.size - 1) + "/" + size
+        }}}})));
+        parts = [];
+        block += 1;
+      }}
+    }}
+  }}
+
+  return new ReadableStream({{
+    pull: function(controller) {{
+      return reader.read().then(function(result) {{
+        if (result.done) {{
+          controller.close();
+          finish();
+          return;
+        }}
+        collect(result.value);
+        controller.enqueue(result.value);
+      }}, function(error) {{
+        controller.error(error);
+        finish();
+      }});
+    }},
+    cancel: function(reason) {{
+      finish();
+      return reader.cancel(reason);
+    }}
+  }});
+}}
+
+// Keeps the blocks of the most recently cached videos; cache keys are listed in insertion order
+function trimCache(cache, count) {{
+  return cache.keys().then(function(requests) {{
+    var videos = [];
+    requests.forEach(function(request) {{
+      var video = getVideoUrl(request);
+      if (videos.indexOf(video) >= 0) {{
+        videos.splice(videos.indexOf(video), 1);
+      }}
+      videos.push(video);
+    }});
+    var evicted = videos.slice(0, Math.max(0, videos.length - count));
+    return Promise.all(requests.filter(function(request) {{
+      return evicted.indexOf(getVideoUrl(request)) >= 0;
+    }}).map(function(request) {{
+      return cache.delete(request);
+    }}));
+  }});
+}}
+''',
+
+  # Published in place of the service worker once --service-worker is dropped, since browsers keep
+  # running an installed worker whose script is gone
+  'service_worker_removal': '''// Written by generate.py; do not edit
+self.addEventListener("install", function() {{
+  self.skipWaiting();
+}});
+
+self.addEventListener("activate", function(event) {{
+  var scope = self.registration.scope;
+  event.waitUntil(Promise.all([caches.delete("precache " + scope), caches.delete("videos " + scope)]).then(function() {{
+    return self.registration.unregister();
+  }}));
+}});
+''',
+
+  'live_reload': '<script>new EventSource("{path}").onmessage = function() {{ location.reload(); }};</script>',
+
+  'citation': '''
+      <script>
+      function copyText() {{
+        var text = document.getElementById("citation-to-copy")
+        navigator.clipboard.writeText(text.innerText)
+      }}
+      </script>
+      <div class="code-background">
+        <button class="code-copy-btn" onClick="copyText()">
+          {icon}
+        </button>
+        <pre id="citation-to-copy">
+        {citation}</pre>
+      </div>
+      ''',
+
+  'project': '''
+      <div class="container">{nav}
+        <h1 class="card-title font-weight-normal">{title}</h1>
+        <h4 class="font-weight-light">{authors}</h4>
+        <img src="{image}" class="card-img-top mt-3" alt="{title}-teaser">
+        <p class="font-italic mt-2">{image_caption}</p>
+        {abstract}
+        {videos}  <!-- Embedded videos appear here -->
+        {resources}
+        {citation}
+        {acknowledgements}
+      </div>
+      {video_loader}
+    ''',
+}
+
+def compile_template(source):
+  # Split the source once into literal chunks and field names
+  parts = []
+  for literal, field, _, _ in string.Formatter().parse(source):
+    if literal:
+      parts.append((False, literal))
+    if field is not None:
+      parts.append((True, field))
+
+  def render(fields):
+    for is_field, part in parts:
+      if not is_field:
+        yield part
+        continue
+      value = fields[part]
+      if type(value) is str:
+        yield value
+      elif isinstance(value, (list, tuple)) or hasattr(value, '__next__'):
+        yield from value
+      else:
+        yield str(value)
+  return render
+
+class TemplateCache:
+  def __init__(self, sources):
+    self.sources = sources
+    self.compiled = {}
+
+  def get(self, template):
+    render = self.compiled.get(template)
+    if render is None:
+      STATS['templates compiled'] += 1
+      render = self.compiled[template] = compile_template(self.sources[template])
+    else:
+      STATS['templates reused'] += 1
+    return render
+
+  def stream(self, template, /, **fields):
+    return self.get(template)(fields)
+
+  def render(self, template, /, **fields):
+    return ''.join(self.get(template)(fields))
+
+TEMPLATES = TemplateCache(TEMPLATE_SOURCES)
+
+def partial(function):
+  """Memoizes a partial that does not depend on page data; configure() forgets it."""
+  rendered = {}
+  PARTIAL_CACHES.append(rendered)
+
+  @functools.wraps(function)
+  def render(*args):
+    html = rendered.get(args)
+    if html is None:
+      STATS['partials rendered'] += 1
+      html = rendered[args] = function(*args)
+    else:
+      STATS['partials reused'] += 1
+    return html
+  return render
+
+def get_style_assets():
+  # Inline SVG icons do not need the webfont stylesheet
+  if OPTIONS['icons'] == 'svg':
+    return [style_asset for style_asset in STYLE_ASSETS if style_asset != ICON_STYLESHEET]
+  return STYLE_ASSETS
+
+@partial
+def get_head_html(assets):
+  stylesheets = [
+    TEMPLATES.render('stylesheet', href=os.path.join(assets, style_asset))
+    for style_asset in get_style_assets()
+  ]
+  return TEMPLATES.render('head', stylesheets=stylesheets)
+
+@partial
+def get_service_worker_html(assets):
+  if not OPTIONS['service_worker']:
+    return ''
+  return TEMPLATES.render('service_worker_registration',
+                          path=os.path.join(os.path.dirname(assets), SERVICE_WORKER))
+
+@partial
+def get_video_loader_html():
+  return TEMPLATES.render('video_loader')
+
+def get_video_attributes(poster = ''):
+  # Lazy videos wait for the shared loader to play them once they scroll into view;
+  # without a poster the metadata is fetched so the first frame can be shown
+  if OPTIONS['video_loading'] != 'lazy':
+    return ''
+  if poster:
+    return f' muted loop playsinline preload="none" poster="{poster}" data-lazy-video'
+  return ' muted loop playsinline preload="metadata" data-lazy-video'
+
+def get_video_loader_for(videos):
+  if OPTIONS['video_loading'] != 'lazy' or not videos:
+    return ''
+  return get_video_loader_html()
+
+def load_icon_glyphs(assets):
+  """Cuts the glyphs of the FontAwesomeIcons values out of the Font Awesome SVG font."""
+  with open(os.path.join(assets, ICON_STYLESHEET), encoding="utf-8") as file:
+    css = file.read()
+  codepoints = {}
+  for selectors, codepoint in re.findall(r'((?:\.fa-[\w-]+:before\s*,?\s*)+)\{\s*content:\s*"\\(\w+)"', css):
+    for name in re.findall(r'\.(fa-[\w-]+):before', selectors):
+      codepoints[name] = codepoint.lower()
+
+  with open(os.path.join(assets, ICON_FONT), encoding="utf-8") as file:
+    font = file.read()
+  default_advance = int(get_attribute(re.search(r'<font\b[^>]*>', font).group(0), 'horiz-adv-x'))
+  icons = {}
+  for icon in FontAwesomeIcons:
+    names = [name for name in icon.value.split() if name in codepoints]
+    if len(names) != 1:
+      continue
+    # Only the handful of glyphs in use are looked up rather than parsing all of them
+    position = font.find(f'unicode="&#x{codepoints[names[0]]};"')
+    if position == -1:
+      continue
+    tag = font[font.rfind('<glyph', 0, position):font.find('>', position) + 1]
+    path = get_attribute(tag, 'd')
+    if path:
+      icons[icon.value] = [int(get_attribute(tag, 'horiz-adv-x') or default_advance), path]
+  return icons
+
+@partial
+def get_icon_html(icon):
+  glyph = OPTIONS['icon_glyphs'].get(str(icon)) if OPTIONS['icons'] == 'svg' else None
+  if glyph is None:
+    return TEMPLATES.render('icon', icon=icon)
+
+  # Glyphs are drawn y-up on a 1792 unit em with the baseline at 1536; fa-fw centers
+  # them in a box 1.28571429em (2304 units) wide
+  advance, path = glyph
+  box = 2304 if 'fa-fw' in str(icon).split() else advance
+  return TEMPLATES.render('svg_icon', width=f'{box / 1792:.8g}', x=f'{(advance - box) / 2:g}',
+                          box=box, path=path)
+
+@partial
+def get_nav_html(label):
+  return TEMPLATES.render('nav', icon=get_icon_html(FontAwesomeIcons.BACK_ARROW), label=label)
+
+def write_page(path, assets, body):
+  """Streams a page made of the shared head and the body chunks to path/index.html."""
+  if not os.path.exists(path):
+    os.makedirs(path)
+  if OPTIONS['validate']:
+    body = list(body)
+
+  output = os.path.join(path, 'index.html')
+  minifier = HtmlMinifier() if OPTIONS['minify_html'] else None
+  size = 0
+  # Sections are rendered by the caller; the streamed templates, minifying and the file write land here
+  with PROFILER.span('write'), HtmlWriter(output) as out:
+    for chunk in TEMPLATES.stream('page', head=get_head_html(assets), body=body,
+                                  service_worker=get_service_worker_html(assets)):
+      if minifier:
+        size += len(chunk.encode('utf-8'))
+        chunk = minifier.feed(chunk)
+      out.write(chunk)
+    if minifier:
+      out.write(minifier.close())
+
+  if minifier:
+    minified_size = os.path.getsize(output)
+    STATS['html bytes before minifying'] += size
+    STATS['html bytes after minifying'] += minified_size
+    print(f'  minified {output}: {size} -> {minified_size} bytes')
+  if OPTIONS['validate']:
+    with PROFILER.span('validate'):
+      validate_page(output, assets, ''.join(body))
+
+def normalize_html(html):
+  return re.sub(r'\s+', ' ', html).replace('> <', '><')
+
+def validate_page(output, assets, body):
+  from bs4 import BeautifulSoup
+
+  # Build the page the way the BeautifulSoup renderer did and compare the parsed trees
+  soup = BeautifulSoup('<!DOCTYPE html> <html></html>', 'html.parser')
+  head = soup.new_tag('head')
+  soup.html.append(head)
+  head.append(soup.new_tag('meta', charset="UTF-8"))
+  for style_asset in get_style_assets():
+    head.append(soup.new_tag('link', rel='stylesheet', type='text/css',
+                             href=os.path.join(assets, style_asset)))
+  body_tag = soup.new_tag('body')
+  soup.html.append(body_tag)
+  body_tag.append(BeautifulSoup(body + get_service_worker_html(assets), 'html.parser'))
+
+  expected = str(soup)
+  if OPTIONS['minify_html']:
+    # The page was minified chunk by chunk, which must agree with minifying it whole
+    expected = str(BeautifulSoup(minify_html(expected), 'html.parser'))
+
+  with open(output, encoding="utf-8") as file:
+    streamed = BeautifulSoup(file.read(), 'html.parser')
+  if normalize_html(str(streamed)) != normalize_html(expected):
+    raise ValueError(f'{output} does not match the BeautifulSoup rendering')
+
+class Record:
+  """Immutable content record. Its FIELDS live in __slots__, the INTERNED ones share one string
+  per distinct value, and records compare and hash by value so caches and digests can key on them."""
+  __slots__ = ('_hash',)
+  FIELDS = ()
+  INTERNED = ()
+
+  def assign(self, **values):
+    for name, value in values.items():
+      if name in self.INTERNED and isinstance(value, str):
+        value = sys.intern(value)
+      object.__setattr__(self, name, value)
+
+  def __setattr__(self, name, value):
+    raise AttributeError(f'{type(self).__name__} records are immutable')
+
+  def __delattr__(self, name):
+    raise AttributeError(f'{type(self).__name__} records are immutable')
+
+  def __init_subclass__(cls):
+    cls.fields_getter = staticmethod(operator.attrgetter(*cls.FIELDS))
+
+  def get_fields(self):
+    return self.fields_getter(self)
+
+  def __eq__(self, other):
+    return self is other or type(self) is type(other) and self.get_fields() == other.get_fields()
+
+  def __hash__(self):
+    try:
+      return self._hash
+    except AttributeError:
+      object.__setattr__(self, '_hash', hash((type(self).__name__,) + self.get_fields()))
+      return self._hash
+
+  # The constructors take the fields in order, which also rebuilds derived slots when unpickled
+  def __reduce__(self):
+    return type(self), self.get_fields()
+
+  def __repr__(self):
+    fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.FIELDS)
+    return f'{type(self).__name__}({fields})'
+
+class Person(Record):
+  FIELDS = ('name', 'website', 'me', 'key')
+  INTERNED = ('name', 'website', 'key')
+  __slots__ = FIELDS
+
+  # key is the name of the people/ entry, which is also the folder of the person's page
+  def __init__(self, name, website, me = False, key = ''):
+    self.assign(name=name, website=website, me=me, key=key)
+
+class Publication(Record):
+  FIELDS = ('image', 'title', 'url', 'authors', 'joint_authors', 'venue', 'award')
+  INTERNED = ('venue', 'award')
+  __slots__ = FIELDS + ('author_suffixes',)
+
+  def __init__(self, 
+               image, 
+               title, 
+               url,
+               authors = (), 
+               joint_authors = (),
+               venue = '', 
+               award = ''):
+    # joint_authors maps a suffix to the authors it marks, given as a dict or as pairs
+    joint_authors = tuple((suffix, tuple(people)) for suffix, people in dict(joint_authors).items())
+    self.assign(image=image, title=title, url=url, authors=tuple(authors),
+                joint_authors=joint_authors, venue=venue, award=award)
+
+    # Resolved once, in author order; an author in several groups keeps the suffix of the last one
+    suffixes = {}
+    for contribution_suffix, people in joint_authors:
+      for author in people:
+        suffixes[author] = sys.intern(contribution_suffix)
+    self.assign(author_suffixes=tuple(suffixes.get(author, '') for author in self.authors))
+
+  def get_author_names(self, prefix = ''):
+    """Renders the byline; prefix leads from the page to the site root, for links to person pages."""
+    return get_byline_html(self.authors, self.author_suffixes, prefix if OPTIONS['author_pages'] else None)
+
+@partial
+def get_byline_html(authors, suffixes, prefix):
+  names = ''
+  for i, (author, suffix) in enumerate(zip(authors, suffixes)):
+    name = author.name + suffix
+
+    if (author.me):
+      names += f'<b>{name}</b>'
+
+    elif (len(author.website) > 0):
+      names += f'<a href={author.website}>{name}</a>'
+
+    elif prefix is not None and author.key:
+      names += f'<a href="{prefix}people/{author.key}/">{name}</a>'
+
+    else:
+      names += name
+
+    if i < len(authors) - 1:
+      names += ", "
+
+  return names
+
+class AuthorIndex:
+  """Maps the key of every author to their Person and publications, in publication order."""
+
+  def __init__(self, publications):
+    self.people = {}
+    self.publications = {}
+    for id, pub in publications.items():
+      for author in pub.authors:
+        self.people.setdefault(author.key, author)
+        self.publications.setdefault(author.key, []).append(pub)
+
+  def get_coauthors(self, key):
+    """Returns (person, number of shared publications) in order of first collaboration."""
+    counts = Counter()
+    for pub in self.publications[key]:
+      counts.update(author.key for author in pub.authors if author.key != key)
+    return [(self.people[coauthor], count) for coauthor, count in counts.items()]
+
+PEOPLE_FOLDER = 'people'
+
+def remove_stale_person_pages(root, people):
+  folder = os.path.join(root, PEOPLE_FOLDER)
+  if not os.path.isdir(folder):
+    return
+  for name in os.listdir(folder):
+    if name not in people and os.path.isfile(os.path.join(folder, name, 'index.html')):
+      shutil.rmtree(os.path.join(folder, name))
+  if not os.listdir(folder):
+    os.rmdir(folder)
+
+class PersonPage:
+  def __init__(self, person, publications, coauthors):
+    self.person = person
+    self.publications = publications
+    self.coauthors = coauthors
+
+  def generate(self, path):
+    write_page(path, '../../assets', TEMPLATES.stream('person',
+      nav=get_nav_html('home'),
+      name=self.person.name,
+      website=TEMPLATES.render('person_website', url=self.person.website) if self.person.website else '',
+      publications=get_publications_list_html(path, self.publications, '../../'),
+      coauthors=[
+        TEMPLATES.render('coauthor_item', url=f'../{person.key}/', name=person.name,
+                         count=count, papers='publication' if count == 1 else 'publications')
+        for person, count in self.coauthors
+      ]))
+
+class ProjectResources(Record):
+  FIELDS = ('publication', 'code')
+  __slots__ = FIELDS
+
+  def __init__(self, publication = (), code = ()):
+    self.assign(publication=tuple(publication), code=tuple(code))
+
+class Resource(Record):
+  FIELDS = ('icon', 'path', 'name')
+  INTERNED = ('name',)
+  __slots__ = FIELDS
+
+  def __init__(self, icon = FontAwesomeIcons.NONE, path = '', name = ''):
+    self.assign(icon=icon, path=path, name=name)
+
+class Course(Record):
+  FIELDS = ('image', 'name', 'url', 'role', 'details')
+  INTERNED = ('role',)
+  __slots__ = FIELDS
+
+  def __init__(self, image, name, url, role, details):
+    self.assign(image=image, name=name, url=url, role=role, details=details)
+
+class Video(Record):
+  FIELDS = ('name', 'id', 'poster')
+  INTERNED = ('name',)
+  __slots__ = FIELDS
+
+  def __init__(self, name, id, poster = ''):
+    self.assign(name=name, id=id, poster=poster)
+
+# Widths of the resized copies of list thumbnails, displayed at 80px (150px for ongoing projects)
+THUMBNAIL_WIDTHS = [80, 160, 320]
+
+def get_resized_images(source):
+  """Returns (width, image, webp) for each resized copy of source, creating missing ones."""
+  from PIL import Image
+
+  # Copies are named after the source content, so they are only redone when its bytes change
+  cache = os.path.join(os.path.dirname(source), 'resized')
+  name = os.path.splitext(os.path.basename(source))[0]
+  prefix = f'{name}.{hash_file(source)[:12]}-'
+
+  with Image.open(source) as image:
+    has_alpha = image.mode in ('RGBA', 'LA', 'P')
+    extension = 'png' if has_alpha else 'jpg'
+    widths = [width for width in THUMBNAIL_WIDTHS if width < image.width] or [image.width]
+    variants = [
+      (width,
+       os.path.join(cache, f'{prefix}{width}.{extension}'),
+       os.path.join(cache, f'{prefix}{width}.webp'))
+      for width in widths
+    ]
+    missing = [variant for variant in variants if not all(map(os.path.exists, variant[1:]))]
+    if not missing:
+      STATS['thumbnails reused'] += len(variants)
+      return variants
+
+    # Copies of the other sources sharing the stem (pub3.jpg and pub3.png) are kept
+    folder = os.path.dirname(source)
+    current = {f'{name}.{hash_file(os.path.join(folder, sibling))[:12]}-' for sibling in os.listdir(folder)
+               if os.path.splitext(sibling)[0] == name and os.path.isfile(os.path.join(folder, sibling))}
+    os.makedirs(cache, exist_ok=True)
+    for stale in os.listdir(cache):
+      match = re.fullmatch(r'(.+\.[0-9a-f]{12}-)\d+\.\w+', stale)
+      if match and match.group(1).startswith(f'{name}.') and match.group(1) not in current:
+        os.remove(os.path.join(cache, stale))
+
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    for width, resized_path, webp_path in missing:
+      height = max(1, round(image.height * width / image.width))
+      resized = image.resize((width, height), Image.LANCZOS)
+      for path, format, settings in [
+        (resized_path, 'PNG' if has_alpha else 'JPEG', {'optimize': True, 'quality': 85}),
+        (webp_path, 'WEBP', {'quality': 80, 'method': 6}),
+      ]:
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        resized.save(temp_path, format, **settings)
+        STATS.update(get_asset_store().materialize(temp_path, path, move=True))
+    STATS['thumbnails generated'] += len(missing)
+    STATS['thumbnails reused'] += len(variants) - len(missing)
+  return variants
+
+def get_thumbnail_html(path, src, sizes, attributes):
+  # src is relative to the page written into path, which may not exist yet
+  source = os.path.normpath(os.path.join(path, src))
+  if not OPTIONS['thumbnails'] or not os.path.isfile(source):
+    return TEMPLATES.render('thumbnail', src=src, attributes=attributes)
+
+  def url(file):
+    return os.path.relpath(file, path).replace(os.sep, '/')
+
+  variants = get_resized_images(source)
+  return TEMPLATES.render('responsive_thumbnail',
+    src=url(variants[0][1]),
+    srcset=', '.join(f'{url(image)} {width}w' for width, image, _ in variants),
+    webp_srcset=', '.join(f'{url(webp)} {width}w' for width, _, webp in variants),
+    sizes=sizes,
+    attributes=attributes)
+
+class AboutMe:
+  def __init__(self, name, image, resources):
+    self.name = name
+    self.image = image
+    self.resources = resources
+
+  def get_html(self):
+    links = [
+      TEMPLATES.render('profile_link', icon=get_icon_html(resource.icon), path=resource.path, name=resource.name)
+      for resource in self.resources
+    ]
+    return TEMPLATES.render('about_me', image=self.image, name=self.name, links=links)
+
+# Item urls are relative to the site root; listing pages further down prefix them
+def get_ongoing_projects_html(path, ongoing_projects, prefix = ''):
+  project_list = []
+  for project in ongoing_projects:
+      # Use main image if defined, else first image from the list, else use placeholder
+      thumbnail = project.image or (project.images[0] if project.images else 'assets/default_placeholder.png')
+
+      # Optionally display a video icon if videos exist
+      video_icon = '<i class="fas fa-video ml-2"></i>' if project.videos else ''
+
+      image = get_thumbnail_html(path, prefix + thumbnail, '150px',
+        'class="thumbnail img-responsive" style="max-width: 150px; height: auto;"')
+      project_list.append(TEMPLATES.render('ongoing_item',
+        image=image, url=prefix_url(project.url, prefix), title=project.title, video_icon=video_icon))
+  return ''.join(project_list)
+
+def get_publications_list_html(path, publications, prefix = ''):
+  pub_list = []
+  for pub in publications:
+    pub_award_text = f'''<div class="paper-award">{pub.award}</div>'''
+    pub_list.append(TEMPLATES.render('publication_item',
+      image=get_thumbnail_html(path, prefix + pub.image, '80px', 'class="thumbnail img-responsive"'),
+      url=prefix_url(pub.url, prefix), title=pub.title, authors=pub.get_author_names(prefix),
+      venue=pub.venue, award=pub_award_text if pub.award else ''))
+  return ''.join(pub_list)
+
+def get_teaching_list_html(path, courses, prefix = ''):
+  teaching_list = []
+  for course in courses:
+    teaching_list.append(TEMPLATES.render('course_item',
+      image=get_thumbnail_html(path, prefix + course.image, '80px', 'class="thumbnail img-responsive"'),
+      url=prefix_url(course.url, prefix), name=course.name, role=course.role, details=course.details))
+  return ''.join(teaching_list)
+
+def prefix_url(url, prefix):
+  return map_relative_url(url, lambda path: prefix + path) if prefix else url
+
+# Home page sections that can be split over several pages: section -> (heading, folder, renderer)
+LISTING_SECTIONS = {
+  'publications': ('Publications', 'publications', get_publications_list_html),
+  'ongoing': ('Ongoing Projects', 'ongoing-projects', get_ongoing_projects_html),
+  'teaching': ('Teaching', 'teaching', get_teaching_list_html),
+}
+LISTING_INDEX = 'index.json'
+
+def get_listing_page_count(section, items):
+  size = OPTIONS['page_sizes'].get(section)
+  return max(1, -(-len(items) // size)) if size else 1
+
+def get_listing_page_items(section, items, number):
+  size = OPTIONS['page_sizes'].get(section)
+  return items[size * (number - 1):size * number] if size else items
+
+def remove_stale_listing_pages(root, section, count):
+  folder = os.path.join(root, LISTING_SECTIONS[section][1])
+  if not os.path.isdir(folder):
+    return
+  for name in os.listdir(folder):
+    match = re.fullmatch(r'page-(\d+)', name)
+    if match and int(match.group(1)) > count:
+      shutil.rmtree(os.path.join(folder, name))
+  index = os.path.join(folder, LISTING_INDEX)
+  if os.path.exists(index) and (count == 1 or not OPTIONS['listing_index']):
+    os.remove(index)
+  if not os.listdir(folder):
+    os.rmdir(folder)
+
+SEARCH_INDEX = 'search'
+SEARCH_INDEX_NAME = re.compile(r'^search\.[0-9a-f]{12}\.json$')
+
+def get_search_terms(text):
+  return re.findall(r'[^\W_]+', unescape(re.sub(r'<[^>]*>', ' ', text)).lower())
+
+def build_search_index(documents):
+  """Builds an inverted index over (title, url, text) documents: the sorted terms are front coded
+  as [length of the prefix shared with the previous term, rest of the term] and each term's
+  posting list holds the first document number followed by the gaps to the next ones."""
+  postings = {}
+  for number, (_, _, text) in enumerate(documents):
+    for term in dict.fromkeys(get_search_terms(text)):
+      postings.setdefault(term, []).append(number)
+
+  terms = []
+  lists = []
+  previous = ''
+  for term in sorted(postings):
+    shared = len(os.path.commonprefix([previous, term]))
+    terms.append([shared, term[shared:]])
+    numbers = postings[term]
+    lists.append(numbers[:1] + [b - a for a, b in zip(numbers, numbers[1:])])
+    previous = term
+  docs = [[unescape(re.sub(r'<[^>]*>', '', title)).strip(), url] for title, url, _ in documents]
+  return {'docs': docs, 'terms': terms, 'postings': lists}
+
+def write_search_index(directory, documents):
+  """Writes the index of the documents to assets/search.<hash>.json, removes older ones and
+  returns its path relative to directory."""
+  start = time.perf_counter()
+  index = build_search_index(documents)
+  data = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+  name = f'{SEARCH_INDEX}.{hashlib.sha256(data).hexdigest()[:12]}.json'
+  write_file(os.path.join(directory, 'assets', name), data)
+  remove_stale_search_indexes(directory, name)
+  milliseconds = (time.perf_counter() - start) * 1000
+  STATS['search index bytes'] = len(data)
+  print(f'  search index: {len(documents)} documents, {len(index["terms"])} terms, '
+        f'{len(data)} bytes, built in {milliseconds:.1f} ms')
+  return f'assets/{name}'
+
+def remove_stale_search_indexes(directory, keep = None):
+  assets = os.path.join(directory, 'assets')
+  for name in os.listdir(assets):
+    if name != keep and SEARCH_INDEX_NAME.match(name):
+      os.remove(os.path.join(assets, name))
+
+class Home:
+  def __init__(self, about_me, bio, publications = [], courses = [], ongoing_projects=[], projects = {}):
+    self.about_me = about_me
+    self.bio = bio
+    self.publications = publications 
+    self.courses = courses
+    self.ongoing_projects = ongoing_projects
+    self.projects = projects
+
+  def get_search_documents(self):
+    documents = []
+    for id, pub in self.publications.items():
+      authors = ' '.join(author.name for author in pub.authors)
+      abstract = self.projects[id].abstract if id in self.projects else ''
+      documents.append((pub.title, pub.url, ' '.join([pub.title, authors, pub.venue, abstract])))
+    for project in self.ongoing_projects:
+      documents.append((project.title, project.url, ' '.join((project.title,) + project.details)))
+    return documents
+
+  def get_search_html(self, path):
+    if not OPTIONS['search']:
+      if os.path.isdir(os.path.join(path, 'assets')):
+        remove_stale_search_indexes(path)
+      return ''
+    return TEMPLATES.render('search', index=write_search_index(path, self.get_search_documents()))
+
+  def get_listing_items(self, section):
+    return {
+      'publications': list(self.publications.values()),
+      'ongoing': self.ongoing_projects,
+      'teaching': self.courses,
+    }[section]
+
+  def get_listing_html(self, path, section):
+    """Renders the first page of a section, followed by a link to the next one if it is split."""
+    heading, folder, render = LISTING_SECTIONS[section]
+    items = self.get_listing_items(section)
+    count = get_listing_page_count(section, items)
+    remove_stale_listing_pages(path, section, count)
+    if count == 1:
+      return render(path, items)
+
+    html = TEMPLATES.render('listing_items', section=section,
+      items=render(path, get_listing_page_items(section, items, 1)))
+    more = TEMPLATES.render('listing_more', href=f'{folder}/page-2/', label=heading.lower(), index='')
+    if OPTIONS['listing_index']:
+      index = {
+        'page_size': OPTIONS['page_sizes'][section],
+        'total': len(items),
+        'pages': [f'page-{number}/' for number in range(2, count + 1)],
+      }
+      os.makedirs(os.path.join(path, folder), exist_ok=True)
+      write_file(os.path.join(path, folder, LISTING_INDEX), json.dumps(index, separators=(',', ':')))
+      more = TEMPLATES.render('listing_more', href=f'{folder}/page-2/', label=heading.lower(),
+        index=f' data-listing-index="{folder}/{LISTING_INDEX}"')
+    return html + more
+
+  def get_ongoing_projects_html(self, path = ''):
+    return self.get_listing_html(path, 'ongoing')
+
+  def get_publications_list_html(self, path = ''):
+    return self.get_listing_html(path, 'publications')
+
+  def get_teaching_list_html(self, path = ''):
+    return self.get_listing_html(path, 'teaching')
+
+  def get_listing_pages(self, root):
+    """Returns (section, number, items, count) for every page of the split sections but the first."""
+    pages = []
+    for section in LISTING_SECTIONS:
+      items = self.get_listing_items(section)
+      count = get_listing_page_count(section, items)
+      for number in range(2, count + 1):
+        pages.append((section, number, get_listing_page_items(section, items, number), count))
+    return pages
+
+  def generate(self, path):
+    paginated = any(get_listing_page_count(section, self.get_listing_items(section)) > 1
+                    for section in LISTING_SECTIONS)
+    with PROFILER.span('about me'):
+      about_me = self.about_me.get_html()
+    with PROFILER.span('publications'):
+      publications = self.get_publications_list_html(path)
+    with PROFILER.span('ongoing projects'):
+      ongoing_projects = self.get_ongoing_projects_html(path)
+    with PROFILER.span('teaching'):
+      teaching = self.get_teaching_list_html(path)
+    with PROFILER.span('search index'):
+      search = self.get_search_html(path)
+    body = TEMPLATES.stream('home', about_me=about_me, bio=self.bio, publications=publications,
+      ongoing_projects=ongoing_projects, teaching=teaching, search=search)
+    if paginated and OPTIONS['listing_index']:
+      body = itertools.chain(body, [get_listing_loader_html()])
+    write_page(path, 'assets', body)
+
+@partial
+def get_listing_loader_html():
+  return TEMPLATES.render('listing_loader')
+
+class ListingPage:
+  """A page of a home page section past its first page_size items."""
+
+  def __init__(self, section, number, items, count):
+    self.section = section
+    self.number = number
+    self.items = items
+    self.count = count
+
+  def generate(self, path):
+    heading, _, render = LISTING_SECTIONS[self.section]
+    previous = '../../' if self.number == 2 else f'../page-{self.number - 1}/'
+    pager = [TEMPLATES.render('listing_link', href=previous, label='Previous')]
+    if self.number < self.count:
+      pager.append(TEMPLATES.render('listing_link', href=f'../page-{self.number + 1}/', label='Next'))
+    write_page(path, '../../assets', TEMPLATES.stream('listing_page',
+      nav=get_nav_html('home'),
+      heading=heading,
+      items=TEMPLATES.render('listing_items', section=self.section,
+        items=render(path, self.items, '../../')),
+      pager=pager))
+
+class OngoingProject(Record):
+    FIELDS = ('image', 'title', 'url', 'details', 'videos', 'images')
+    __slots__ = FIELDS
+
+    def __init__(self, image='', title='', url='', details=(), videos=(), images=()):
+        self.assign(
+            image=image,            # Main preview image (optional)
+            title=title,
+            url=url,
+            details=tuple(details), # Description points
+            videos=tuple(videos),   # Video paths
+            images=tuple(images))   # Image paths
+
+    def generate(self, path):
+        """Generates the HTML for this project."""
+        # Videos already live in the project directory, so they are made faststart in place
+        video_paths = [os.path.join(path, video) for video in self.videos]
+        with PROFILER.span('faststart'):
+            if OPTIONS['faststart']:
+                for video_path in video_paths:
+                    if os.path.isfile(video_path) and faststart_in_place(video_path):
+                        STATS['videos made faststart'] += 1
+
+        write_page(path, '../../assets', TEMPLATES.stream('ongoing',
+            nav=get_nav_html('Home'),
+            title=self.title,
+            # Convert details into a bulleted list
+            details=[f'<li>{detail}</li>' for detail in self.details],
+            images=[TEMPLATES.render('ongoing_image', src=img) for img in self.images],
+            videos=[
+              TEMPLATES.render('ongoing_video', src=video, size=get_video_size_attributes(video_path),
+                               attributes=get_video_attributes())
+              for video, video_path in zip(self.videos, video_paths)
+            ],
+            video_loader=get_video_loader_for(self.videos)))
+
+
+class Project(Record):
+  FIELDS = ('image', 'image_caption', 'abstract', 'videos', 'resources', 'acknowledgements', 'citation')
+  __slots__ = FIELDS
 
-class Project:
   def __init__(self, 
                image,
                image_caption, 
                abstract, 
-               videos = [], 
-               resources = ProjectResources(), 
+               videos = (), 
+               resources = None, 
                acknowledgements= '', 
                citation = ''):
-    self.image = image
-    self.image_caption = image_caption
-    self.abstract = abstract
-    self.videos = videos
-    self.resources = resources
-    self.acknowledgements = acknowledgements
-    self.citation = citation
+    self.assign(image=image, image_caption=image_caption, abstract=abstract, videos=tuple(videos),
+                resources=resources or ProjectResources(), acknowledgements=acknowledgements,
+                citation=citation)
 
   def create_section(self, name, content):
-    return f'''
-      <div>
-        <h2 class="mt-4 font-weight-normal">{name}</h2>
-        <hr>
-        {content}
-      </div>
-    '''
+    return TEMPLATES.render('section', name=name, content=content)
 
   def create_resources_list(self, name, resources):
-    resources_list = ''
-    for resource in resources:
-      resources_list += f'''
-        <div class="container mt-1 mb-1">
-          <i class="{resource.icon}"></i>
-          <a href="{resource.path}">
-            {resource.name}
-          </a>
-        </div>
-        '''
-    return f'''
-      <div>
-        <h4 class="mt-4 font-weight-light">
-          {name}
-        </h4>
-        {resources_list}
-      </div>
-    '''
-    
-
+    resources_list = [
+      TEMPLATES.render('resource', icon=get_icon_html(resource.icon), path=resource.path, name=resource.name)
+      for resource in resources
+    ]
+    return TEMPLATES.render('resources_list', name=name, resources=resources_list)
 
   def get_abstract_html(self):
     if len(self.abstract) == 0:
       return ''
     return self.create_section('Abstract', f'<p>{self.abstract}</p>')
 
-  def get_video_html(self):
-    if len(self.videos) == 0:
-        return ''
-
-    video_list = '<div class="container">'
-    video_list += '<h2 class="mt-4 font-weight-normal">Visualization</h2><hr>'
-
-    for i in range(0, len(self.videos), 2):
-        video_list += '<div class="row">'
-
-        # First video
-        video_list += f'''
-            <div class="col-md-6">
-                <h4 class="font-weight-light">{self.videos[i].name}</h4>
-                <video class="autoplay-video embed-responsive-item project-video" 
-                       width="100%" muted loop playsinline>
-                    <source src="{self.videos[i].id}" type="video/mp4">
-                    Your browser does not support the video tag.
-                </video>
-            </div>
-        '''
-
-        # Second video (if exists)
-        if i + 1 < len(self.videos):
-            video_list += f'''
-                <div class="col-md-6">
-                    <h4 class="font-weight-light">{self.videos[i + 1].name}</h4>
-                    <video class="autoplay-video embed-responsive-item project-video" 
-                           width="100%" muted loop playsinline>
-                        <source src="{self.videos[i + 1].id}" type="video/mp4">
-                        Your browser does not support the video tag.
-                    </video>
-                </div>
-            '''
-
-        video_list += '</div>'  # Close row
-
-    video_list += '</div>'  # Close container
-
-    # Add JavaScript to force autoplay
-    video_list += '''
-    <script>
-        document.addEventListener("DOMContentLoaded", function() {
-            let videos = document.querySelectorAll(".autoplay-video");
-            videos.forEach(video => {
-                video.play().catch(error => {
-                    console.log("Autoplay prevented. User interaction required.");
-                });
-            });
-        });
-    </script>
-    '''
-    
-    return self.create_section('Visualization', video_list)
+  def get_embedded_videos_html(self, path, video_paths, poster_paths):
+    # Two videos per row
+    rows = []
+    for i in range(0, len(video_paths), 2):
+        rows.append('<div class="row">')
+        for video, video_path, poster_path in zip(self.videos[i:i + 2], video_paths[i:i + 2], poster_paths[i:i + 2]):
+            rows.append(TEMPLATES.render('project_video', name=video.name, src=video_path,
+                                         size=get_video_size_attributes(os.path.join(path, video_path), ' width="100%"'),
+                                         attributes=get_video_attributes(poster_path)))
+        rows.append('</div>')
+    return TEMPLATES.render('project_videos', rows=rows)
 
   def get_resources_html(self):
     resources_html = ''
@@ -512,464 +2202,1327 @@ class Project:
     if len(self.citation) == 0:
       return ''
 
-    return self.create_section('Cite', f'''
-      <script>
-      function copyText() {{
-        var text = document.getElementById("citation-to-copy")
-        navigator.clipboard.writeText(text.innerText)
-      }}
-      </script>
-      <div class="code-background">
-        <button class="code-copy-btn" onClick=copyText()>
-          <i class="{FontAwesomeIcons.COPY}"></i>
-        </button>
-        <pre id="citation-to-copy">
-        {self.citation}</pre>
-      </div>
-      '''
-    )
+    return self.create_section('Cite', TEMPLATES.render('citation',
+      icon=get_icon_html(FontAwesomeIcons.COPY), citation=self.citation))
 
   def generate(self, path, publication):
-    soup = BeautifulSoup('<!DOCTYPE html> <html></html>', 'html.parser')
-
-    # Add styling
-    head = soup.new_tag('head')
-    head.append(soup.new_tag('meta', charset="UTF-8"))
-    soup.html.append(head)
-    links = [
-        soup.new_tag('link', rel='stylesheet', type='text/css', 
-                     href=os.path.join('../../assets', style_asset))
-        for style_asset in STYLE_ASSETS
-    ]
-    [head.append(link) for link in links] 
-
-    # Construct body
-    body = soup.new_tag('body')
-    soup.html.append(body)
-    
-    # Copy videos into the project directory
-    video_paths = []
-    for video in self.videos:
-        video_filename = os.path.basename(video.id)
-        video_dest = os.path.join(path, video_filename)
-        
-        # Copy video only if it doesn't exist in the destination folder
-        if not os.path.exists(video_dest):
-            shutil.copy(video.id, video_dest)
-
-        video_paths.append(video_filename)  # Store correct video path
-
-    # Generate video HTML (two videos per row)
-    videos_html = '<div class="container">'
-    videos_html += '<h2 class="mt-4 font-weight-normal">Visualization</h2><hr>'
-
-    for i in range(0, len(video_paths), 2):
-        videos_html += '<div class="row">'
-
-        # First video
-        videos_html += f'''
-            <div class="col-md-6">
-                <h4 class="font-weight-light">{self.videos[i].name}</h4>
-                <video controls class="embed-responsive-item project-video" width="100%">
-                    <source src="{video_paths[i]}" type="video/mp4">
-                    Your browser does not support the video tag.
-                </video>
-            </div>
-        '''
-
-        # Second video (if exists)
-        if i + 1 < len(video_paths):
-            videos_html += f'''
-                <div class="col-md-6">
-                    <h4 class="font-weight-light">{self.videos[i + 1].name}</h4>
-                    <video controls class="embed-responsive-item project-video" width="100%">
-                        <source src="{video_paths[i + 1]}" type="video/mp4">
-                        Your browser does not support the video tag.
-                    </video>
-                </div>
-            '''
-
-        videos_html += '</div>'  # Close row
-
-    videos_html += '</div>'  # Close container
-
-    # Add the full page content
-    body.append(BeautifulSoup(f'''
-      <div class="container">
-        <nav class="navbar navbar-expand-lg">
-          <div class="container-fluid">
-            <ul class="navbar-nav ml-auto">
-              <li class="nav-item"> 
-                <a href="../../">
-                <i class="{FontAwesomeIcons.BACK_ARROW}"></i>
-                home
-                </a>
-              </li>
-            </ul>
-          </div>
-        </nav>
-        <h1 class="card-title font-weight-normal">{publication.title}</h1>
-        <h4 class="font-weight-light">{publication.get_author_names()}</h4>
-        <img src="{self.image}" class="card-img-top mt-3" alt="{publication.title}-teaser">
-        <p class="font-italic mt-2">{self.image_caption}</p>
-        {self.get_abstract_html()}
-        {videos_html}  <!-- Embedded videos appear here -->
-        {self.get_resources_html()}
-        {self.get_citation_html()}
-        {self.get_acknowledgements_html()}
-      </div>
-    ''', 'html.parser'))
-
     # Ensure directory exists
     if not os.path.exists(path):
         os.makedirs(path)
 
-    # Write the final HTML file
-    with open(os.path.join(path, 'index.html'), "w", encoding="utf-8") as file:
-        file.write(str(soup))
-
-PEOPLE = {
-  'your-name': Person(
-    name = 'Meher Niger',
-    website = '',
-    me = True
-  ),
-  'coauthor-name': Person(
-    name = 'W Moree, M Bluhm, J Eriksen, G Chen, D Mayerich',
-    website = ''
-  ),
-  'coauthor-name-other': Person(
-    name = 'H Goharbavang, A Pillai, JD Wythe, G Chen, D Mayerich',
-    website = ''
-  ),
-  'coauthor-name-other2': Person(
-    name = 'Mohammad Istiaque Reja, Jobaida Akhtar, Nishat Jahan, Rubaya Absar, Saleha Fatema',
-    website = ''
-  ),
-  'coauthor-name-other3': Person(
-    name = 'Tazkia Fairuz Hasin',
-    website = ''
-  ),
-  'coauthor-name-other4': Person(
-    name = 'Tazkia Fairuz Hasin, Mohammed Abu Faiz Nizami, Muhammad Alam Rafee',
-    website = ''
-  )
-}
+    # Sync videos and their posters into the project directory from the asset store
+    video_paths = [os.path.basename(video.id) for video in self.videos]
+    poster_paths = [os.path.basename(video.poster) for video in self.videos]
+    media = [(video.id, os.path.join(path, video_path)) for video, video_path in zip(self.videos, video_paths)]
+    media += [(video.poster, os.path.join(path, poster_path))
+              for video, poster_path in zip(self.videos, poster_paths) if video.poster]
+    with PROFILER.span('media'):
+      sync_media(media)
+
+    with PROFILER.span('sections'):
+      sections = dict(
+        nav=get_nav_html('home'),
+        title=publication.title,
+        authors=publication.get_author_names('../../'),
+        image=self.image,
+        image_caption=self.image_caption,
+        abstract=self.get_abstract_html(),
+        videos=self.get_embedded_videos_html(path, video_paths, poster_paths),
+        video_loader=get_video_loader_for(self.videos),
+        resources=self.get_resources_html(),
+        citation=self.get_citation_html(),
+        acknowledgements=self.get_acknowledgements_html())
 
-ABOUT_ME = AboutMe(
-  name = 'Meher Niger',
-  image = 'data/images/profile1.jpg', 
-  resources=[
-    Resource(
-      icon=FontAwesomeIcons.MAP_MARKER,
-      name='University of Houston',
-      path='https://www.uh.edu'
-    ),
-    Resource(
-      icon=FontAwesomeIcons.ENVELOPE,
-      name='mehernigeretho@gmail.com',
-      path='mailto:mehernigeretho@gmail.com'
-    ),
-    Resource(
-      icon=FontAwesomeIcons.GITHUB,
-      name='Github',
-      path='https://github.com/meherniger24'
-    ),
-    Resource(
-      icon=FontAwesomeIcons.GRAD_CAP,
-      name='Google Scholar',
-      path='https://scholar.google.com/citations?user=VnKZqyIAAAAJ&hl=en&oi=ao'
-    ),
-    Resource(
-      icon=FontAwesomeIcons.GRAD_CAP,
-      name='Linkedin',
-      path='https://www.linkedin.com/in/meher-niger-84177bb1/'
-    ),
-    Resource(
-      icon=FontAwesomeIcons.FILE,
-      name='CV',
-      path='data/documents/cv.pdf'
-    )
-  ]
-)
-
-BIO = '''I'm a fifth year Ph.D. student at University of Houston where I'm advised by Dr. <a href="https://www.ece.uh.edu/faculty/mayerich/">David Mayerich</a>. My current research focuses on creating GPU-accelerated algorithms, computational methods for modeling, analyzing and visualizing gigavoxel-scale data. I have also developed computational methods for sparse volumetric microvasculature in OpenVDB optimized with TBB multithreading parallelism. Currently, I am working on a deep learning based 3D Stardist model to detect specific kinds of nuclei AND Developing A fully parallel 3D thinning algorithm for giga-voxel scale microvasculature using OpenVDB. My work is supported by the NSF Graduate Research Fellowship. I received a B.Sc in Electrical and Electronics Enginnering at Chittagong University of Engineering and Technology, Bangladesh, where my research focus was on Photonic Crystal Fiber.'''
-
-PUBLICATIONS = {
-  'pub1': Publication(
-    image =  'data/images/thumbnails/liver.png',
-    title =  'SEGMENTATION OF MICROVASCULAR NETWORKS EMBEDDED IN GIGAVOXEL 3D IMAGES USING RSF LEVEL SETS WITH OPENVDB',
-    url = 'project/pub1',
-    authors =  [
-      PEOPLE['your-name'],
-      PEOPLE['coauthor-name'],
-    ],
-    venue = '2025 IEEE International Symposium on Biomedical Imaging (ISBI 2025)',
-  ),
-  'pub2': Publication(
-    image =  'data/images/thumbnails/KESM.jpg',
-    title =  'GPU-Accelerated RSF Level Set Evolution for Large-Scale Microvascular Segmentation',
-    url = 'project/pub2',
-    authors =  [
-      PEOPLE['your-name'],
-      PEOPLE['coauthor-name-other']
-    ],
-    venue = 'Cell Reports Methods',
-  ),
-  
-  'pub3': Publication(
-    image =  'data/images/thumbnails/pub3.JPG',
-    title =  'Modified Dodecagonal PCF Sensor with High Sensitivity for Detecting Harmful Chemical Compounds used in Poultry Feed',
-    url = 'https://ieeexplore.ieee.org/abstract/document/8975607/',
-    authors =  [
-      PEOPLE['your-name'],
-      PEOPLE['coauthor-name-other2']
-    ],
-    venue = '2019 5th International Conference on Advances in Electrical Engineering (ICAEE)',
-  ),
-  'pub4': Publication(
-    image =  'data/images/thumbnails/pub4.JPG',
-    title =  'Detection of harmful chemical compounds in plastics with highly sensitive photonic crystal fiber with higher nonlinear coefficient',
-    url = 'https://ieeexplore.ieee.org/abstract/document/9065165/',
-    authors =  [
-      PEOPLE['your-name'],
-      PEOPLE['coauthor-name-other3']
-    ],
-    venue = '2019 IEEE International Conference on Signal Processing, Information, Communication & Systems (SPICSCON)',
-  ),
-  
-  'pub5': Publication(
-    image =  'data/images/thumbnails/pub5.JPG',
-    title =  'Three modified structures of photonic crystal fiber for estimation of sulfuric acid concentration with low confinement Loss and negative dispersion',
-    url = 'https://ieeexplore.ieee.org/abstract/document/9068781/',
-    authors =  [
-      PEOPLE['your-name'],
-      PEOPLE['coauthor-name-other4']
-    ],
-    venue = '2019 4th International Conference on Electrical Information and Communication Technology (EICT)',
-  )
-}
-
-video1 = Video(name="Ongoing Project 1 Demo", id="ongoing/pro1/video.mp4")
+    # Write the final HTML file
+    write_page(path, '../../assets', TEMPLATES.stream('project', **sections))
 
-ONGOING_PROJECTS = [
-    
-    
-    OngoingProject(
-        image='data/images/thumbnails/skele.JPG',
-        title='An End-to-End Pipeline for Vascular Network Extraction and Quantitative Characterization: Segmentation, Skeletonization, and Comparative Benchmarking',
-        #description='Description of ongoing project 2.',
-        details=[
-            "I have been developing an integrated software framework that combines segmentation, skeletonization, and quantitative vascular analysis into a single pipeline. This framework enables automated vessel extraction, graph-based skeleton representation, and computation of key descriptors such as radius, tortuosity, curvature, volume, and surface area. By linking voxel-level image processing with graph-based modeling, my work bridges the gap between raw image data and clinically meaningful biomarkers. To support this framework, I designed custom data structures in C++ for efficient representation of vascular graphs, nodes, and edges, enabling scalable analysis of large volumetric datasets. These data structures were optimized for memory efficiency and integrated seamlessly with high-performance computing libraries such as OpenVDB and TBB. In addition, I developed visualization and interactive analysis tools using OpenGL and Dear ImGui, which allow real-time rendering, editing, and exploration of vascular networks."
-            "  3D Visualization is coming soon....."
-        ],
-        url = 'ongoing/pro2',
-        #videos=["video.mp4"]
-    ),
-    
-    
-    OngoingProject(
-        image='data/images/thumbnails/stardist.JPG',
-        title='Cell segmentation with Deep Learning based StarDist 3D',
-        details=[
-            "I am working on a deep learning-based Stardist 3D model to segment individual cells. To facilitate this, I developed a GUI using PyQt to manually label each cell with its corresponding name, enabling the preparation of high-quality training data.",
-            "The GUI includes several features:"
-            "Data Loading: It supports loading two volumes (raw and segmented) along with a text file containing class IDs and their corresponding names. The text file can be edited or modified as needed, and the GUI automatically updates the cell IDs and names upon loading.",
-            "Zoom and Transparency: Users can zoom in and out for detailed cell examination and adjust the transparency level between the raw and segmented volumes for better visualization.",
-            "Cell Viewing Options: The GUI allows users to view only labeled cells, unlabeled cells, or all cells at once."
-            "Data Saving: The final labeled cells can be saved in .npy or .txt format for further use. This tool streamlines the process of annotating cells and ensures the creation of accurate training data for deep learning models.."
-            "A video of the GUI has been provided for reference."
-        ],
-        url = 'ongoing/pro1',
-        videos=["video.mp4"]
-    ), 
-    OngoingProject(
-        image='data/images/thumbnails/Picture1.jpg',
-        title='Weak to Strong Segmentation',
-        
-        url = 'ongoing/pro3',
-        #videos=["video.mp4"]
-    )
-    
-]
+CONTENT_DIRECTORY = 'content'
 
+def get_natural_key(name):
+  return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
 
-COURSES = [
-    Course(
-      image = 'data/images/thumbnails/numerical.jpg',
-      name = 'Numerical Methods for Electrical and Computer Engineers',
-      url = 'https://www.uh.edu',
-      role = 'Teaching Assistant',
-      details = 'UH, ECE, Spring 2024'
-    ),
-    
-  Course(
-    image = 'data/images/thumbnails/antenna.JPG',
-    name = 'Antenna Engineering',
-    url = 'https://www.uh.edu',
-    role = 'Teaching Assistant',
-    details = 'UH, ECE, Spring 2021'
-  ),
-  Course(
-    image = 'data/images/thumbnails/robotics.JPG',
-    name = 'Intro to Robotics',
-    url = 'https://www.uh.edu',
-    role = 'Teaching Assistant',
-    details = 'UH, ECE, Fall 2020'
-  ),
-  Course(
-    image = 'data/images/thumbnails/tele.jpg',
-    name = 'Advanced Telecommunication',
-    url = 'https://www.uh.edu',
-    role = 'Teaching Assistant',
-    details = 'UH, ECE, Fall 2020'
-  )
-]
+class ContentCatalog:
+  """Site content kept as one JSON file per entry, parsed on first use and again only once
+  the file changes. Tracks which files were read so pages know what they depend on."""
 
-PROJECT_PAGES = {
-  'pub1': Project(
-    image = '../../data/images/liver.png',
-    image_caption = 'Liver vasculature imaged using MUVE. (a-b) Front and back view of the reconstruction from 1500 slices and (c-g) several iterated higher-resolution zooms.',
-    abstract = 'Microvascular networks are vital for tissue function and disease progression, but their complex three-dimensional structure makes them difficult to analyze. Recent milling- based microscopy methods can capture images of these networks in whole organs at high resolution, though the resulting gigavoxel-scale images are challenging to segment. Convolutional neural networks (CNNs) are commonly used for this task, but they cannot account for the networks shape and topology. This paper presents a solution using a fully auto-mated milling microscope to create a gigavoxel-scale dataset of mouse liver microvasculature. A CNN is trained to create an initial segmentation of the vascular network. The vessels are then refined using a parallel RSF-based level set model. To make this model practical on such large volumes, it is implemented in parallel using a sparse OpenVDB data structure that reduces the grid size to approxately 4% of the original.',
-    resources = ProjectResources(
-      publication = [
-        Resource(
-          icon = FontAwesomeIcons.PDF,
-          path = 'https://scholar.google.com/citations?view_op=view_citation&hl=en&user=VnKZqyIAAAAJ&citation_for_view=VnKZqyIAAAAJ:UeHWp8X0CEIC',
-          name = 'Paper'
-        ),
-        #Resource(
-        #  icon = FontAwesomeIcons.BOOK,
-         # path = 'https://www.acm.org/',
-        #  name =  'Publisher\'s Version'
-        #),
-        #Resource(
-       #   icon =  FontAwesomeIcons.ARCHIVE,
-       #   path =  'https://arxiv.org',
-       #   name =  'ArXiv Version'
-       # )
-      ],
-      code = [
-        Resource(
-          icon =  FontAwesomeIcons.GITHUB,
-          path =  'https://github.com/meherniger24/paper-rsf-openvdb',
-          name = 'Github project with full source code'
-        )
-      ],
-    ),
-    videos=[
-            Video(name='Visualization of a vessel cube in openvdb vdb_view', id='docs/project/pub1/openvdb.mp4'),
-           # Video(name='Evolution of the level set from 𝜙<sub>0</sub> to 𝜙<sub>n</sub></p> ', id='docs/project/pub1/video3.mp4')
-            
-        ],
-   # videos = [
-    #  Video(
-    #    name =  'presentation slides',
-    #    id = 'tjYVcOJONdI'
-   #   )
-   # ],
-    #acknowledgements = 'This work was generously supported by XYZ',
-    #citation = '''
-    #@article{
-     # Author:PAPER:2024,
-     # title={Placeholder Title},
-     # volume={42},
-     # ISSN={1557-7368},
-     # url={https://www.arxiv.org},
-     # number={4},
-     # journal={ACM Transactions on Graphics},
-     # publisher={Association for Computing Machinery (ACM)},
-     # authors={YourName}
-     # year={2024},
-     # month=jul, 
-     # pages={1-100}
-   # }'''
-  ),
-  
-  'pub2': Project(
-    image = '../../data/images/KESM.jpg',
-    image_caption = 'Whole brain vasculature imaged using knife edge scanning microscopy (KESM) and available online (kesm.cs.tamu.edu)(a) Reconstruction from 140 slices across the whole brain is shown, along with (b) a 4000*2000*2000 voxel sub-volume with (c-e) several iterated higher-resolution zooms.',
-    abstract = 'Microvascular networks are challenging to reconstruct because they are composed of individual structures near the resolution limit of existing microscopes, making boundary detection difficult. Machine learning tools like convolutional neural networks are effective at semantic segmentation, however they cannot leverage existing information about the global structure of these networks. Level sets are suitable for solving this problem, since they can integrate both the local tube-like structure of capillaries and globally complex topology. However active contours are computationally intensive, making them impractical for terabyte-scale images. We propose a highly parallel formulation of the region-scalable fitting (RSF) model, making it viable for three-dimensional gigavoxel images. We first train a U-Net to provide an initial contour, and then use the proposed RSF model to finalize the segmentation. We tested this approach on microvascular data acquired using multiple state-of-the-art imaging methods. We assess the performance using a Monte-Carlo validation technique and compare results to existing algorithms. This study showcases the practical application of the RSF model, emphasizing its utility in the challenging domain of large-scale high-topology network segmentation with a particular focus on building microvascular models.',
-    resources = ProjectResources(
-      publication = [
-        Resource(
-          icon = FontAwesomeIcons.PDF,
-          path = 'https://pmc.ncbi.nlm.nih.gov/articles/PMC11037869/',
-          name = 'Paper'
-        ),
-        #Resource(
-        #  icon = FontAwesomeIcons.BOOK,
-         # path = 'https://www.acm.org/',
-        #  name =  'Publisher\'s Version'
-        #),
-        #Resource(
-       #   icon =  FontAwesomeIcons.ARCHIVE,
-       #   path =  'https://arxiv.org',
-       #   name =  'ArXiv Version'
-       # )
-      ],
-      code = [
-        Resource(
-          icon =  FontAwesomeIcons.GITHUB,
-          path =  'https://github.com/meherniger24/paper-rsf-vesselseg',
-          name = 'Github project with full source code'
-        )
-      ],
-    ),
-    videos=[
-            Video(name='360&#176 rotation of the evolved 𝜙<sub>n</sub></p>', id='docs/project/pub1/video1.mp4'),
-            Video(name='Evolution of the level set from 𝜙<sub>0</sub> to 𝜙<sub>n</sub></p> ', id='docs/project/pub1/video3.mp4')
-            
-        ],
-   # videos = [
-   #   Video(
-   #     name =  'presentation slides',
-   #     id = 'tjYVcOJONdI'
-   #   )
-   # ],
-    #acknowledgements = 'This work was generously supported by XYZ',
-    #citation = '''
-    #@article{
-     # Author:PAPER:2024,
-     # title={Placeholder Title},
-     # volume={42},
-     # ISSN={1557-7368},
-     # url={https://www.arxiv.org},
-     # number={4},
-     # journal={ACM Transactions on Graphics},
-     # publisher={Association for Computing Machinery (ACM)},
-     # authors={YourName}
-     # year={2024},
-     # month=jul, 
-     # pages={1-100}
-   # }'''
-  )
-}
+  def __init__(self, path):
+    self.path = path
+    self.files = {}
+    self.people = {}
+    self.reads = None
+
+  @contextlib.contextmanager
+  def track(self):
+    """Collects the files read inside the block."""
+    self.reads = set()
+    try:
+      yield self.reads
+    finally:
+      self.reads = None
+
+  def read(self, name):
+    path = os.path.join(self.path, name)
+    stat = os.stat(path)
+    cached = self.files.get(path)
+    if cached is None or cached[0] != [stat.st_size, stat.st_mtime_ns]:
+      STATS['content files parsed'] += 1
+      with open(path, encoding="utf-8") as file:
+        cached = self.files[path] = [[stat.st_size, stat.st_mtime_ns], json.load(file)]
+    if self.reads is not None:
+      self.reads.add(path)
+    return cached[1]
+
+  def list(self, folder):
+    """Returns the keys of the entries in folder in natural order, so entry2 comes before entry10."""
+    path = os.path.join(self.path, folder)
+    # Adding or removing an entry changes the pages listing the folder
+    if self.reads is not None:
+      self.reads.add(path + os.sep)
+    keys = [name[:-len('.json')] for name in os.listdir(path) if name.endswith('.json')]
+    return sorted(keys, key=get_natural_key)
+
+  def get_resources(self, resources):
+    return [
+      Resource(**dict(resource, icon=FontAwesomeIcons[resource.get('icon', 'NONE')]))
+      for resource in resources
+    ]
 
+  def get_about_me(self):
+    data = self.read('about.json')
+    return AboutMe(data['name'], data['image'], self.get_resources(data.get('resources', [])))
+
+  def get_bio(self):
+    return self.read('about.json').get('bio', '')
+
+  def get_publication(self, key):
+    data = dict(self.read(f'publications/{key}.json'))
+    data['authors'] = [self.get_person(author) for author in data.get('authors', [])]
+    data['joint_authors'] = {
+      suffix: [self.get_person(author) for author in authors]
+      for suffix, authors in data.get('joint_authors', {}).items()
+    }
+    return Publication(**data)
+
+  def get_person(self, key):
+    # Publications by the same author share one record while the entry is unchanged
+    data = self.read(f'people/{key}.json')
+    cached = self.people.get(key)
+    if cached is None or cached[0] is not data:
+      cached = self.people[key] = [data, Person(**data, key=key)]
+    return cached[1]
+
+  def get_publications(self):
+    return {key: self.get_publication(key) for key in self.list('publications')}
+
+  def get_ongoing_project(self, key):
+    return OngoingProject(**self.read(f'ongoing/{key}.json'))
+
+  def get_ongoing_projects(self):
+    return [self.get_ongoing_project(key) for key in self.list('ongoing')]
+
+  def get_courses(self):
+    return [Course(**self.read(f'courses/{key}.json')) for key in self.list('courses')]
+
+  def get_project(self, key):
+    data = dict(self.read(f'projects/{key}.json'))
+    resources = data.get('resources', {})
+    data['resources'] = ProjectResources(
+      publication=self.get_resources(resources.get('publication', [])),
+      code=self.get_resources(resources.get('code', [])))
+    data['videos'] = [Video(**video) for video in data.get('videos', [])]
+    return Project(**data)
+
+CONTENT = ContentCatalog(CONTENT_DIRECTORY)
+
+BUILD_MANIFEST = '.build-manifest.json'
+
+class Page:
+  def __init__(self, path, generate, args, inputs, dependencies = ()):
+    self.path = path
+    self.generate = generate
+    self.args = args
+    self.inputs = inputs
+    self.dependencies = dependencies
 
-if __name__ == '__main__':
-    directory = 'docs/'
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+  @property
+  def output(self):
+    return os.path.join(self.path, 'index.html')
 
+class BuildManifest:
+  def __init__(self, path):
+    self.path = path
+    self.pages = {}
+    if os.path.exists(path):
+      with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+      # Each page maps to {'digest', 'media', 'outputs'}
+      self.pages = {output: entry for output, entry in data.get('pages', {}).items() if isinstance(entry, dict)}
+      FILE_HASHES.update(data.get('files', {}))
+
+  def is_fresh(self, page, entry):
+    recorded = self.pages.get(page.output)
+    if recorded is None or recorded['digest'] != entry['digest'] or not os.path.exists(page.output):
+      return False
+    # Media the page published (videos, resized thumbnails) may have been deleted from the tree
+    return all(os.path.exists(path) for path in recorded.get('outputs', ()))
+
+  def record(self, page, entry):
+    self.pages[page.output] = entry
+
+  def prune(self, pages):
+    """Drops the entries of pages that are no longer built."""
+    outputs = {page.output for page in pages}
+    self.pages = {output: entry for output, entry in self.pages.items() if output in outputs}
+
+  def save(self):
+    write_file(self.path, json.dumps({'pages': self.pages, 'files': FILE_HASHES}, indent=1, sort_keys=True))
+
+def get_generator_version():
+  return hash_file(os.path.abspath(__file__))
+
+def update_digest(digest, value, strings):
+  if isinstance(value, Enum):
+    value = value.value
+  if isinstance(value, str):
+    strings.append(value)
+    data = value.encode('utf-8')
+    digest.update(b's%d:' % len(data) + data)
+  elif value is None or isinstance(value, (bool, int, float)):
+    digest.update(f'v{value!r};'.encode('utf-8'))
+  elif isinstance(value, dict):
+    digest.update(b'd%d:' % len(value))
+    for key, item in value.items():
+      update_digest(digest, key, strings)
+      update_digest(digest, item, strings)
+  elif isinstance(value, (list, tuple)):
+    digest.update(b'l%d:' % len(value))
+    for item in value:
+      update_digest(digest, item, strings)
+  elif isinstance(value, Record):
+    digest.update(f'o{type(value).__name__}:'.encode('utf-8'))
+    update_digest(digest, value.get_fields(), strings)
+  elif hasattr(value, '__dict__'):
+    digest.update(f'o{type(value).__name__}:'.encode('utf-8'))
+    update_digest(digest, vars(value), strings)
+  else:
+    raise TypeError(f'cannot fingerprint {type(value).__name__}')
+
+def get_media_files(strings, bases):
+  media = []
+  for value in strings:
+    if not value or len(value) > 512 or any(c.isspace() for c in value):
+      continue
+    for base in bases:
+      candidate = os.path.normpath(os.path.join(base, value))
+      if os.path.isfile(candidate):
+        media.append(candidate)
+        break
+  return sorted(set(media))
+
+def get_dependency_hash(path):
+  # Folders stand for the list of entries in them
+  if path.endswith(os.sep):
+    return hashlib.sha256('\n'.join(sorted(os.listdir(path))).encode('utf-8')).hexdigest()
+  return hash_file(path)
+
+def get_page_digest(page, version):
+  """Returns the manifest entry of the page: its digest and the media it uses."""
+  digest = hashlib.sha256(version.encode('utf-8'))
+  update_digest(digest, STYLE_ASSETS, [])
+  update_digest(digest, {key: value for key, value in OPTIONS.items() if key not in BUILD_ONLY_OPTIONS}, [])
+  for path in sorted(page.dependencies):
+    digest.update(f'c{path}:{get_dependency_hash(path)};'.encode('utf-8'))
+
+  # Media paths are found among the strings of the page, relative to either the page, the site
+  # root or the working directory; they are looked up on every build so files added since are tracked
+  strings = []
+  update_digest(hashlib.sha256(), page.inputs, strings)
+  media = get_media_files(strings, [page.path, page.root, '.'])
+  for path in media:
+    digest.update(f'm{path}:{hash_file(path)};'.encode('utf-8'))
+  return {'digest': digest.hexdigest(), 'media': media}
+
+def get_page_outputs(page):
+  """Returns the local files the rendered page loads, which must still exist for it to be fresh."""
+  with open(page.output, encoding="utf-8") as file:
+    html = file.read()
+  outputs = set()
+
+  def add(path):
+    outputs.add(os.path.normpath(os.path.join(page.path, unquote(path))))
+    return path
+  for url in get_page_resources(html):
+    map_relative_url(url, add)
+  return sorted(path for path in outputs if os.path.isfile(path))
+
+def get_pages(directory):
+  with CONTENT.track() as dependencies:
     home = Home(
-        about_me=ABOUT_ME, 
-        bio=BIO, 
-        publications=PUBLICATIONS,
-        ongoing_projects=ONGOING_PROJECTS,
-        courses=COURSES
+        about_me=CONTENT.get_about_me(),
+        bio=CONTENT.get_bio(),
+        publications=CONTENT.get_publications(),
+        ongoing_projects=CONTENT.get_ongoing_projects(),
+        courses=CONTENT.get_courses(),
+        # Project abstracts are only read for the search index
+        projects={id: CONTENT.get_project(id) for id in CONTENT.list('projects')} if OPTIONS['search'] else {}
     )
-              
-    home.generate(directory)
-    
-    for id, project in PROJECT_PAGES.items():
-        project_path = os.path.join(directory, f'project/{id}')
-        paper = PUBLICATIONS[id]
-        project.generate(project_path, paper)
-
-    # Generate ongoing project pages
-    for ongoing_project in ONGOING_PROJECTS:
-        project_path = os.path.join(directory, f'{ongoing_project.url}')
-        ongoing_project.generate(project_path)
+  pages = [Page(directory, home.generate, (directory,), home, dependencies)]
+
+  # Sections split over several pages continue in <folder>/page-K/
+  for section, number, items, count in home.get_listing_pages(directory):
+    listing = ListingPage(section, number, items, count)
+    listing_path = os.path.join(directory, LISTING_SECTIONS[section][1], f'page-{number}')
+    pages.append(Page(listing_path, listing.generate, (listing_path,), listing, dependencies))
+
+  people = {}
+  if OPTIONS['author_pages']:
+    authors = AuthorIndex(home.publications)
+    people = authors.people
+    for key, person in people.items():
+      person_page = PersonPage(person, authors.publications[key], authors.get_coauthors(key))
+      person_path = os.path.join(directory, PEOPLE_FOLDER, key)
+      pages.append(Page(person_path, person_page.generate, (person_path,), person_page, dependencies))
+  remove_stale_person_pages(directory, people)
+
+  for id in CONTENT.list('projects'):
+    with CONTENT.track() as dependencies:
+      project = CONTENT.get_project(id)
+      paper = CONTENT.get_publication(id)
+    project_path = os.path.join(directory, f'project/{id}')
+    pages.append(Page(project_path, project.generate, (project_path, paper), (project, paper), dependencies))
+
+  # Generate ongoing project pages
+  for key in CONTENT.list('ongoing'):
+    with CONTENT.track() as dependencies:
+      ongoing_project = CONTENT.get_ongoing_project(key)
+    project_path = os.path.join(directory, f'{ongoing_project.url}')
+    pages.append(Page(project_path, ongoing_project.generate, (project_path,), ongoing_project, dependencies))
+
+  for page in pages:
+    page.root = directory
+  return pages
+
+# Classes, ids and tags that only appear once inline scripts run, so the page scan cannot see them
+CSS_SAFELIST = [
+  'text-muted',  # "No results" line of the search box
+]
 
+CSS_TOKENS = re.compile(r'''"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[{};]|[^"'{};]+''')
+CSS_COMMENTS = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.S)
+
+# At-rules whose block holds declarations rather than nested rules
+CSS_DECLARATION_AT_RULES = ('@font-face', '@page', '@-ms-viewport', '@viewport')
+
+def parse_css(text):
+  """Parses a stylesheet into (prelude, body) rules, where body is None for statements,
+  a declarations string, or a list of nested rules."""
+  tokens = [token for token in CSS_TOKENS.findall(CSS_COMMENTS.sub(lambda match: match.group(1) or '', text))]
+  position = 0
+
+  def parse_rules():
+    nonlocal position
+    rules = []
+    prelude = ''
+    while position < len(tokens):
+      token = tokens[position]
+      position += 1
+      if token == ';':
+        if prelude.strip():
+          rules.append((prelude.strip(), None))
+        prelude = ''
+      elif token == '}':
+        break
+      elif token == '{':
+        prelude = prelude.strip()
+        if prelude.startswith('@') and not prelude.lower().startswith(CSS_DECLARATION_AT_RULES):
+          rules.append((prelude, parse_rules()))
+        else:
+          declarations = ''
+          while position < len(tokens) and tokens[position] != '}':
+            declarations += tokens[position]
+            position += 1
+          position += 1
+          rules.append((prelude, declarations))
+        prelude = ''
+      else:
+        prelude += token
+    return rules
+
+  return parse_rules()
+
+def minify_css_text(text, separators = ';:,{}'):
+  # Strings are kept verbatim; elsewhere whitespace collapses and disappears around separators
+  pattern = re.compile(r'\s*([' + re.escape(separators) + r'])\s*')
+  parts = []
+  for token in re.findall(r'''"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[^"']+''', text):
+    if token[0] in '"\'':
+      parts.append(token)
+    else:
+      parts.append(pattern.sub(r'\1', re.sub(r'\s+', ' ', token)))
+  return ''.join(parts).strip().rstrip(';')
+
+def is_selector_used(selector, used):
+  # Structure is ignored: a selector is kept when every class, id and tag it names is
+  # used somewhere on the site
+  simplified = re.sub(r'\[[^\]]*\]|::?[a-zA-Z-]+(\([^)]*\))?', ' ', selector)
+  names = set(re.findall(r'\.(-?[_a-zA-Z][\w-]*)', simplified))
+  names |= {'#' + name for name in re.findall(r'#(-?[_a-zA-Z][\w-]*)', simplified)}
+  names |= {'<' + name.lower() for name in re.findall(r'(?:^|[\s>+~,])([a-zA-Z][a-zA-Z0-9]*)', simplified)}
+  return names <= used
+
+def prune_css(rules, used, keyframes = None):
+  """Returns the rules whose selectors match the used names, with unmatched selectors removed."""
+  pruned = []
+  for prelude, body in rules:
+    lower = prelude.lower()
+    if body is None or lower.startswith(('@page', '@-ms-viewport', '@viewport')):
+      pruned.append((prelude, body))
+    elif lower.startswith(('@font-face', '@keyframes', '@-webkit-keyframes', '@-moz-keyframes')):
+      # Kept only if a surviving rule refers to them, see prune_unreferenced_css
+      pruned.append((prelude, body))
+    elif isinstance(body, list):
+      nested = prune_css(body, used)
+      if nested:
+        pruned.append((prelude, nested))
+    else:
+      selectors = [selector.strip() for selector in prelude.split(',')]
+      selectors = [selector for selector in selectors if is_selector_used(selector, used)]
+      if selectors:
+        pruned.append((','.join(selectors), body))
+  return pruned
+
+def get_css_declarations(rules):
+  for prelude, body in rules:
+    if isinstance(body, list):
+      yield from get_css_declarations(body)
+    elif body is not None and not prelude.startswith('@'):
+      yield body
+
+def prune_unreferenced_css(rules):
+  # Fonts and animations survive only if a kept rule still uses them
+  declarations = ' '.join(get_css_declarations(rules))
+  pruned = []
+  for prelude, body in rules:
+    lower = prelude.lower()
+    if lower.startswith('@font-face'):
+      family = re.search(r'font-family\s*:\s*([^;]+)', body or '')
+      if not family or family.group(1).strip().strip('\'"') not in declarations:
+        continue
+    elif 'keyframes' in lower.split()[0]:
+      if prelude.split()[-1] not in declarations:
+        continue
+    elif isinstance(body, list):
+      body = prune_unreferenced_css(body)
+    pruned.append((prelude, body))
+  return pruned
+
+def serialize_css(rules):
+  parts = []
+  for prelude, body in rules:
+    prelude = minify_css_text(prelude, ',>{}' if not prelude.startswith('@') else '{}')
+    if body is None:
+      parts.append(prelude + ';')
+    elif isinstance(body, list):
+      parts.append(prelude + '{' + serialize_css(body) + '}')
+    else:
+      parts.append(prelude + '{' + minify_css_text(body) + '}')
+  return ''.join(parts)
+
+def map_relative_url(url, function):
+  """Replaces the path of a relative url with function(path), keeping its query and fragment."""
+  if not url or re.match(r'^([a-z][a-z0-9+.-]*:|/|#)', url, re.I):
+    return url
+  path, suffix = re.match(r'([^?#]*)(.*)', url).groups()
+  return function(path) + suffix
+
+def map_css_urls(css, function):
+  def replace(match):
+    return f'url({match.group(1)}{map_relative_url(match.group(2), function)}{match.group(1)})'
+  return re.sub(r'''url\(\s*(['"]?)(.*?)\1\s*\)''', replace, css)
+
+def rebase_css_urls(css, source_dir, target_dir):
+  return map_css_urls(css, lambda path:
+    os.path.relpath(os.path.join(source_dir, path), target_dir).replace(os.sep, '/'))
+
+def get_attribute(tag, name):
+  match = re.search(r'''\s%s\s*=\s*("([^"]*)"|'([^']*)'|([^\s>"']+))''' % name, tag, re.I)
+  if match is None:
+    return None
+  return next(value for value in match.groups()[1:] if value is not None)
+
+def get_used_css_names(html):
+  used = {'<' + tag.lower() for tag in re.findall(r'<([a-zA-Z][a-zA-Z0-9-]*)', html)}
+  for tag in re.findall(r'<[a-zA-Z][^>]*>', html):
+    used.update((get_attribute(tag, 'class') or '').split())
+    element_id = get_attribute(tag, 'id')
+    if element_id:
+      used.add('#' + element_id)
+  return used
+
+def relink_stylesheets(html, stylesheets, href):
+  """Replaces the links to the given stylesheets with a single link to href."""
+  replaced = False
+
+  def replace(match):
+    nonlocal replaced
+    if get_attribute(match.group(0), 'href') not in stylesheets:
+      return match.group(0)
+    if replaced:
+      return ''
+    replaced = True
+    return TEMPLATES.render('stylesheet', href=href)
+  return re.sub(r'<link\b[^>]*>', replace, html)
+
+CSS_BUNDLE_NAME = re.compile(r'^bundle\.[0-9a-f]{12}\.css$')
+
+def retire_css_bundles(directory):
+  """Removes the stylesheets written by an earlier build with --bundle-css."""
+  assets = os.path.join(directory, 'assets')
+  if not os.path.isdir(assets):
+    return
+  for name in os.listdir(assets):
+    if CSS_BUNDLE_NAME.match(name):
+      os.remove(os.path.join(assets, name))
+
+def bundle_css(directory, pages):
+  """Writes the rules of STYLE_ASSETS used by the pages into one minified, fingerprinted
+  stylesheet and points every page at it."""
+  assets = os.path.join(directory, 'assets')
+  used = set(CSS_SAFELIST) | set(OPTIONS['css_safelist'])
+  for page in pages:
+    with open(page.output, encoding="utf-8") as file:
+      used |= get_used_css_names(file.read())
+
+  notices = []
+  rules = []
+  total = 0
+  for style_asset in get_style_assets():
+    path = os.path.join(assets, style_asset)
+    with open(path, encoding="utf-8") as file:
+      css = file.read()
+    notices += re.findall(r'/\*!.*?\*/', css, re.S)
+    css = rebase_css_urls(css, os.path.dirname(path), assets)
+    parsed = parse_css(css)
+    total += len(parsed)
+    rules += parsed
+  rules = prune_unreferenced_css(prune_css(rules, used))
+  bundle = '\n'.join(notices + [serialize_css(rules)]) + '\n'
+
+  name = f'bundle.{hashlib.sha256(bundle.encode("utf-8")).hexdigest()[:12]}.css'
+  for stale in os.listdir(assets):
+    if CSS_BUNDLE_NAME.match(stale) and stale != name:
+      os.remove(os.path.join(assets, stale))
+  write_file(os.path.join(assets, name), bundle)
+
+  for page in pages:
+    prefix = os.path.relpath(assets, page.path).replace(os.sep, '/')
+    stylesheets = {os.path.join(prefix, style_asset) for style_asset in STYLE_ASSETS}
+    with open(page.output, encoding="utf-8") as file:
+      html = file.read()
+    stylesheets |= {href for href in re.findall(r'[^"\'\s>=]*bundle\.[0-9a-f]{12}\.css', html)}
+    relinked = relink_stylesheets(html, stylesheets, f'{prefix}/{name}')
+    if relinked != html:
+      write_file(page.output, relinked)
+
+  size = sum(os.path.getsize(os.path.join(assets, style_asset)) for style_asset in get_style_assets())
+  print(f'  css bundle: assets/{name}, {len(bundle)} of {size} bytes kept')
+
+ASSET_MANIFEST = 'asset-manifest.json'
+HEADERS_FILE = '_headers'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+HEADERS_COMMENT = '# Written by generate.py'
+
+# Matches name.<hash>.ext, the names fingerprinted copies (and the css bundle) are published under
+FINGERPRINTED_NAME = re.compile(r'^(.+)\.[0-9a-f]{12}(\.[^./\\]+)$')
+
+def get_original_asset(path):
+  # Fingerprinted copies of an existing file stand for that file
+  match = FINGERPRINTED_NAME.match(path)
+  if match and os.path.isfile(match.group(1) + match.group(2)):
+    return match.group(1) + match.group(2)
+  return path
+
+def map_page_urls(html, function):
+  def replace(match):
+    quote = match.group(2) or ''
+    url = match.group(3) if match.group(2) else match.group(4)
+    return f'{match.group(1)}{quote}{map_relative_url(url, function)}{quote}'
+  # Minified pages leave simple urls unquoted
+  return re.sub(r'''(\s(?:href|src)=)(?:(["'])(.*?)\2|([^\s"'=<>`]+))''', replace, html)
+
+def fingerprint_assets(directory, pages):
+  """Publishes every file under assets/ that the pages reference under a content-hashed name,
+  points the pages at it and writes the asset manifest and the headers file."""
+  assets = os.path.abspath(os.path.join(directory, 'assets'))
+  manifest_path = os.path.join(directory, ASSET_MANIFEST)
+  previous = {}
+  if os.path.exists(manifest_path):
+    with open(manifest_path, encoding="utf-8") as file:
+      previous = json.load(file)
+  store = get_asset_store()
+  published = {}
+
+  def fingerprint(path):
+    source = get_original_asset(path)
+    original = FINGERPRINTED_NAME.sub(r'\1\2', source)
+    if original in published:
+      return published[original]
+
+    if source.endswith('.css'):
+      # Fonts and images a stylesheet loads are fingerprinted too, so its own hash covers them
+      with open(source, encoding="utf-8") as file:
+        css = map_css_urls(file.read(), lambda url: relink(os.path.dirname(source), url))
+      data = css.encode('utf-8')
+      dest = f'{os.path.splitext(original)[0]}.{hashlib.sha256(data).hexdigest()[:12]}.css'
+      temp_path = f'{dest}.{os.getpid()}.tmp'
+      with open(temp_path, 'wb') as file:
+        file.write(data)
+      STATS.update(store.materialize(temp_path, dest, move=True))
+    else:
+      stem, extension = os.path.splitext(original)
+      dest = f'{stem}.{hash_file(source)[:12]}{extension}'
+      STATS.update(store.materialize(source, dest))
+
+    # Generated files that are already fingerprinted, like the css bundle, are renamed rather than copied
+    if source != original and source != dest:
+      os.remove(source)
+    published[original] = dest
+    return dest
+
+  def relink(base, url):
+    target = get_original_asset(os.path.abspath(os.path.join(base, url)))
+    if os.path.commonpath([target, assets]) != assets or not os.path.isfile(target):
+      return url
+    return os.path.relpath(fingerprint(target), base).replace(os.sep, '/')
+
+  for page in pages:
+    with open(page.output, encoding="utf-8") as file:
+      html = file.read()
+    relinked = map_page_urls(html, lambda url: relink(os.path.abspath(page.path), url))
+    if relinked != html:
+      write_file(page.output, relinked)
+
+  root = os.path.abspath(directory)
+  def site_path(path):
+    return os.path.relpath(path, root).replace(os.sep, '/')
+  manifest = {site_path(original): site_path(dest) for original, dest in sorted(published.items())}
+  for stale in set(previous.values()) - set(manifest.values()):
+    if os.path.exists(os.path.join(directory, stale)):
+      os.remove(os.path.join(directory, stale))
+  write_file(manifest_path, json.dumps(manifest, indent=1, sort_keys=True))
+
+  # Resized thumbnails and the search index are named after their content as well
+  immutable = [f'/{path}' for path in manifest.values()]
+  for folder, _, _ in os.walk(directory):
+    if os.path.basename(folder) == 'resized':
+      immutable.append(f'/{site_path(os.path.abspath(folder))}/*')
+  immutable.extend(f'/assets/{name}' for name in os.listdir(assets) if SEARCH_INDEX_NAME.match(name))
+  headers = [f'{HEADERS_COMMENT}: these files are named after their content and never change\n']
+  headers += [f'{path}\n  Cache-Control: {IMMUTABLE_CACHE_CONTROL}\n' for path in sorted(immutable)]
+  write_file(os.path.join(directory, HEADERS_FILE), ''.join(headers))
+  print(f'  fingerprinted assets: {len(manifest)} files, listed in {ASSET_MANIFEST} and {HEADERS_FILE}')
+
+SERVICE_WORKER = 'sw.js'
+PRECACHE_MANIFEST = 'precache-manifest.json'
+SERVICE_WORKER_HEADER = '// Written by generate.py'
+
+# Played with range requests, so the service worker caches the ranges that are played instead
+RUNTIME_CACHED_EXTENSIONS = ('.mp4', '.m4v', '.webm', '.ogv', '.mov')
+RUNTIME_CACHE_MAX_VIDEOS = 4
+RUNTIME_CACHE_BLOCK_SIZE = 1 << 20
+# Larger files are left to the network rather than downloaded on install
+PRECACHE_MAX_SIZE = 4 << 20
+
+def get_page_resources(html):
+  """Returns the urls of the files a page loads: src, srcset, poster and <link> hrefs."""
+  urls = []
+  for tag in re.findall(r'<[a-zA-Z][^>]*>', html):
+    names = ['src', 'poster'] + (['href'] if re.match(r'<link\b', tag, re.I) else [])
+    urls += [get_attribute(tag, name) for name in names]
+    srcset = get_attribute(tag, 'srcset') or ''
+    urls += [candidate.split()[0] for candidate in srcset.split(',') if candidate.strip()]
+  return [url for url in urls if url]
+
+def get_site_url(root, path):
+  url = os.path.relpath(os.path.abspath(path), root).replace(os.sep, '/')
+  if os.path.basename(url) == 'index.html':
+    return url[:-len('index.html')] or './'
+  return url
+
+def write_service_worker(directory, pages):
+  """Writes the precache manifest, the content hashes of the pages and every local file they
+  load, and the service worker that installs and updates them by diffing those hashes."""
+  root = os.path.abspath(directory)
+  files = set()
+
+  def add(base, url):
+    path = os.path.normpath(os.path.join(base, unquote(url)))
+    if os.path.commonpath([os.path.abspath(path), root]) == root and os.path.isfile(path):
+      files.add(path)
+    return url
+
+  for page in pages:
+    files.add(os.path.normpath(page.output))
+    with open(page.output, encoding="utf-8") as file:
+      html = file.read()
+    for url in get_page_resources(html):
+      map_relative_url(url, lambda path: add(page.path, path))
+  # Fonts and images the stylesheets load
+  for path in [path for path in files if path.endswith('.css')]:
+    with open(path, encoding="utf-8") as file:
+      map_css_urls(file.read(), lambda url: add(os.path.dirname(path), url))
+
+  manifest = {'files': {}, 'runtime': {}}
+  size = 0
+  for path in sorted(files):
+    if path.lower().endswith(RUNTIME_CACHED_EXTENSIONS):
+      manifest['runtime'][get_site_url(root, path)] = hash_file(path)[:12]
+    elif os.path.getsize(path) <= PRECACHE_MAX_SIZE:
+      manifest['files'][get_site_url(root, path)] = hash_file(path)[:12]
+      size += os.path.getsize(path)
+  manifest['version'] = hashlib.sha256(json.dumps(manifest, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+  write_file(os.path.join(directory, PRECACHE_MANIFEST), json.dumps(manifest, indent=1, sort_keys=True))
+
+  write_file(os.path.join(directory, SERVICE_WORKER), TEMPLATES.render('service_worker',
+    version=manifest['version'], manifest=PRECACHE_MANIFEST, max_videos=RUNTIME_CACHE_MAX_VIDEOS,
+    block_size=RUNTIME_CACHE_BLOCK_SIZE,
+    video_extensions='|'.join(extension[1:] for extension in RUNTIME_CACHED_EXTENSIONS)))
+  print(f'  service worker: {len(manifest["files"])} files ({size} bytes) precached, '
+        f'{len(manifest["runtime"])} videos cached at runtime, listed in {PRECACHE_MANIFEST}')
+
+def retire_service_worker(directory):
+  """Replaces a generated service worker with one that unregisters itself and drops its caches."""
+  path = os.path.join(directory, SERVICE_WORKER)
+  if not os.path.isfile(path):
+    return
+  with open(path, encoding="utf-8") as file:
+    if not file.read().startswith(SERVICE_WORKER_HEADER):
+      return
+  write_file(path, TEMPLATES.render('service_worker_removal'))
+  if os.path.exists(os.path.join(directory, PRECACHE_MANIFEST)):
+    os.remove(os.path.join(directory, PRECACHE_MANIFEST))
+
+def retire_fingerprinted_assets(directory):
+  """Removes the fingerprinted copies, the asset manifest and the headers file written by an
+  earlier build with fingerprinting on."""
+  manifest_path = os.path.join(directory, ASSET_MANIFEST)
+  if os.path.exists(manifest_path):
+    with open(manifest_path, encoding="utf-8") as file:
+      manifest = json.load(file)
+    for original, copy in manifest.items():
+      # Generated files published under their own hash, like the css bundle, have no original
+      if os.path.isfile(os.path.join(directory, original)) and os.path.exists(os.path.join(directory, copy)):
+        os.remove(os.path.join(directory, copy))
+    os.remove(manifest_path)
+  headers_path = os.path.join(directory, HEADERS_FILE)
+  if os.path.isfile(headers_path):
+    with open(headers_path, encoding="utf-8") as file:
+      generated = file.read().startswith(HEADERS_COMMENT)
+    if generated:
+      os.remove(headers_path)
+
+# Files worth serving precompressed; images, video, pdfs and woff fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = {'.html', '.css', '.js', '.json', '.svg', '.xml', '.txt', '.map', '.ico', '.eot', '.ttf', '.otf'}
+COMPRESSED_EXTENSIONS = ('.gz', '.br', '.zst')
+
+# Below this the compressed response barely differs from the file itself
+PRECOMPRESS_MIN_SIZE = 256
+
+def get_compressors():
+  """Returns the available codecs as {sibling extension: compress function}, at their best ratio."""
+  compressors = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+  try:
+    import brotli
+    compressors['.br'] = lambda data: brotli.compress(data, quality=11)
+  except ImportError:
+    pass
+  try:
+    import zstandard
+    # Ultra levels would need decoding windows larger than browsers accept
+    compressors['.zst'] = lambda data: zstandard.ZstdCompressor(level=19).compress(data)
+  except ImportError:
+    pass
+  return compressors
+
+def precompress_file(path):
+  """Writes the compressed siblings of path that are missing or older than it and returns counters."""
+  events = Counter()
+  modified = os.stat(path).st_mtime_ns
+  data = None
+  for extension, compress in get_compressors().items():
+    sibling = path + extension
+    if os.path.exists(sibling) and os.stat(sibling).st_mtime_ns >= modified:
+      events['precompressed up to date'] += 1
+      continue
+
+    if data is None:
+      with open(path, 'rb') as file:
+        data = file.read()
+    compressed = compress(data)
+    if len(compressed) >= len(data):
+      if os.path.exists(sibling):
+        os.remove(sibling)
+      events['precompress skipped (no gain)'] += 1
+      continue
+    temp_path = f'{sibling}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+      file.write(compressed)
+    os.replace(temp_path, sibling)
+    events[f'precompressed {extension}'] += 1
+    events[f'bytes saved by {extension}'] += len(data) - len(compressed)
+  return events
+
+def is_compressed_sibling(path):
+  stem, extension = os.path.splitext(path)
+  return extension in COMPRESSED_EXTENSIONS and os.path.splitext(stem)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+def retire_compressed_siblings(directory):
+  """Removes the compressed siblings written by an earlier build with --precompress, which
+  would otherwise be served in place of the files they no longer match."""
+  removed = 0
+  for folder, _, names in os.walk(directory):
+    for name in names:
+      if is_compressed_sibling(name):
+        os.remove(os.path.join(folder, name))
+        removed += 1
+  if removed:
+    print(f'  removed {removed} precompressed siblings')
+
+def precompress(directory, jobs = 1):
+  """Writes .gz (and .br/.zst when the codecs are installed) siblings of every compressible file."""
+  files = []
+  for folder, _, names in os.walk(directory):
+    for name in names:
+      path = os.path.join(folder, name)
+      stem, extension = os.path.splitext(path)
+      if extension in COMPRESSED_EXTENSIONS:
+        # Siblings of files that are gone would still be served by gzip_static-style servers
+        if is_compressed_sibling(path) and not os.path.exists(stem):
+          os.remove(path)
+        continue
+      if extension.lower() not in COMPRESSIBLE_EXTENSIONS:
+        continue
+      if os.path.getsize(path) >= PRECOMPRESS_MIN_SIZE:
+        files.append(path)
+      else:
+        for sibling in [path + extension for extension in COMPRESSED_EXTENSIONS]:
+          if os.path.exists(sibling):
+            os.remove(sibling)
+
+  events = Counter()
+  if jobs == 1:
+    for path in files:
+      events.update(precompress_file(path))
+  else:
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+      for result in pool.map(precompress_file, files, chunksize=8):
+        events.update(result)
+  STATS.update(events)
+  written = sum(count for name, count in events.items() if name.startswith('precompressed .'))
+  saved = sum(count for name, count in events.items() if name.startswith('bytes saved'))
+  print(f'  precompressed {written} siblings ({", ".join(get_compressors())}) of {len(files)} files, {saved} bytes saved')
+
+def render_page(page):
+  # Return the counters and profile spans this page added so workers can report them to the parent
+  before = Counter(STATS)
+  PROFILER.page = page.output
+  with PROFILER.span('page'):
+    page.generate(*page.args)
+  return STATS - before, PROFILER.take()
+
+def render_pages(pages, jobs = 1):
+  # Every page is attempted; failures are returned in page order so serial and
+  # parallel builds report the same errors
+  if jobs == 1 or len(pages) < 2:
+    errors = []
+    spans = []
+    for page in pages:
+      try:
+        spans += render_page(page)[1]
+        errors.append(None)
+      except Exception as error:
+        spans += PROFILER.take()
+        errors.append(error)
+    PROFILER.spans = spans
+    return errors
+
+  with ProcessPoolExecutor(max_workers=jobs, initializer=configure, initargs=(OPTIONS,)) as pool:
+    futures = [pool.submit(render_page, page) for page in pages]
+    errors = [future.exception() for future in futures]
+  for future, error in zip(futures, errors):
+    if error is None:
+      counts, spans = future.result()
+      STATS.update(counts)
+      PROFILER.spans += spans
+  return errors
+
+def build(directory, force = False, jobs = 1, **options):
+  configure(options)
+  STATS.clear()
+  PROFILER.clear()
+  if OPTIONS['thumbnails']:
+    try:
+      import PIL
+    except ImportError:
+      print('Pillow is not installed, thumbnails are linked at full size')
+      configure({'thumbnails': False})
+  if OPTIONS['icons'] == 'svg':
+    try:
+      configure({'icon_glyphs': load_icon_glyphs(os.path.join(directory, 'assets'))})
+    except OSError:
+      print('Font Awesome sources not found, icons use the webfont')
+      configure({'icons': 'font'})
+  if not os.path.exists(directory):
+    os.makedirs(directory)
+
+  # The manifest and the asset store live next to the published tree so they are never deployed
+  parent = os.path.dirname(os.path.normpath(directory))
+  manifest_path = os.path.join(parent, BUILD_MANIFEST)
+  configure({'asset_store': os.path.join(parent, ASSET_STORE)})
+  manifest = BuildManifest(manifest_path)
+  version = get_generator_version()
+  published = snapshot_tree(directory)
+  published_hashes = dict(FILE_HASHES)
+
+  pages = get_pages(directory)
+  manifest.prune(pages)
+  skipped = []
+  stale = []
+  for page in pages:
+    entry = get_page_digest(page, version)
+    if not force and manifest.is_fresh(page, entry):
+      skipped.append(page.output)
+    else:
+      stale.append(page)
+
+  errors = render_pages(stale, jobs or os.cpu_count())
+  failed = []
+  for page, error in zip(stale, errors):
+    if error is None:
+      # Rendering may rewrite the page's media in place (faststart), so hash it again
+      entry = get_page_digest(page, version)
+      entry['outputs'] = get_page_outputs(page)
+      manifest.record(page, entry)
+    else:
+      failed.append((page, error))
+
+  manifest.save()
+  objects, copies, saved = get_asset_store().collect()
+  print(f'Rendered {len(stale) - len(failed)} pages, skipped {len(skipped)} unchanged')
+  print(f'  media store: {objects} files linked {copies} times, {saved} bytes saved by hardlinks')
+  for output in skipped:
+    print(f'  skipped {output}')
+  for page, error in failed:
+    print(f'  failed {page.output}: {error!r}')
+  for name, count in sorted(STATS.items()):
+    print(f'  {name}: {count}')
+  if failed:
+    raise failed[0][1]
+
+  # Post-render stages work on every page, including the ones skipped above
+  PROFILER.page = None
+  if OPTIONS['bundle_css']:
+    with PROFILER.span('bundle css'):
+      bundle_css(directory, pages)
+  else:
+    retire_css_bundles(directory)
+  if OPTIONS['fingerprint_assets']:
+    with PROFILER.span('fingerprint assets'):
+      fingerprint_assets(directory, pages)
+  else:
+    retire_fingerprinted_assets(directory)
+  if OPTIONS['service_worker']:
+    with PROFILER.span('service worker'):
+      write_service_worker(directory, pages)
+  else:
+    retire_service_worker(directory)
+  # Pages re-rendered and relinked back to the bytes they had keep their mtime, so neither
+  # precompress, rsync nor the changes report sees them as changed
+  restore_unchanged_files(published, published_hashes)
+  if OPTIONS['precompress']:
+    with PROFILER.span('precompress'):
+      precompress(directory, os.cpu_count() or 1)
+  else:
+    retire_compressed_siblings(directory)
+
+  # Again, for the hashes of the files the post-render stages wrote
+  manifest.save()
+  changes = get_changes(directory, published)
+  write_file(os.path.join(parent, CHANGES_REPORT), json.dumps(changes, indent=1))
+  print(f'Published files: {len(changes["added"])} added, {len(changes["changed"])} changed, '
+        f'{len(changes["removed"])} removed, listed in {CHANGES_REPORT}')
+  if OPTIONS['profile']:
+    write_profile(parent, PROFILER.take())
+  return skipped
+
+CHANGES_REPORT = 'build-changes.json'
+
+def snapshot_tree(directory):
+  """Returns {path: [size, mtime]} for the files under directory."""
+  files = {}
+  for folder, _, names in os.walk(directory):
+    for name in names:
+      if not name.endswith('.tmp'):
+        path = os.path.join(folder, name)
+        stat = os.stat(path)
+        files[path] = [stat.st_size, stat.st_mtime_ns]
+  return files
+
+def restore_unchanged_files(before, hashes):
+  """Gives back their previous mtime to the files of the snapshot before that were rewritten with
+  the content hashes recorded for them."""
+  for path, stat in before.items():
+    known = hashes.get(path)
+    if not known or known[:2] != stat or not os.path.isfile(path):
+      continue
+    current = os.stat(path)
+    if current.st_mtime_ns != stat[1] and current.st_size == stat[0] and hash_file(path) == known[2]:
+      os.utime(path, ns=(current.st_atime_ns, stat[1]))
+      FILE_HASHES[path] = known
+
+def get_changes(directory, before):
+  """Lists the files under directory added, changed and removed since the snapshot before, as
+  paths relative to directory."""
+  after = snapshot_tree(directory)
+  changed = [path for path in after.keys() & before.keys() if after[path] != before[path]]
+
+  def site_paths(paths):
+    return sorted(os.path.relpath(path, directory).replace(os.sep, '/') for path in paths)
+  return {
+    'added': site_paths(after.keys() - before.keys()),
+    'changed': site_paths(changed),
+    'removed': site_paths(before.keys() - after.keys()),
+  }
+
+PROFILE_REPORT = 'build-profile.json'
+PROFILE_TRACE = 'build-trace.json'
+
+def write_profile(directory, spans, top = 10):
+  """Writes the spans as a per-page JSON report, led by the slowest pages and the phases with the
+  largest allocations, and as a Chrome trace for chrome://tracing or https://ui.perfetto.dev."""
+  origin = min((span['start'] for span in spans), default=0)
+  pages = {}
+  for span in sorted(spans, key=lambda span: (span['start'], span['depth'])):
+    page = pages.setdefault(span['page'] or 'build', {'duration_ms': 0, 'peak_bytes': 0, 'phases': []})
+    if span['name'] == 'page':
+      page['duration_ms'] = span['duration'] / 1e6
+      page['peak_bytes'] = span['peak']
+    else:
+      page['phases'].append({
+        'name': span['name'], 'depth': span['depth'],
+        'start_ms': (span['start'] - origin) / 1e6, 'duration_ms': span['duration'] / 1e6,
+        'allocated_bytes': span['allocated'], 'peak_bytes': span['peak'],
+      })
+
+  slowest = sorted(((name, page) for name, page in pages.items() if name != 'build'),
+                   key=lambda item: -item[1]['duration_ms'])[:top]
+  phases = [(name, phase) for name, page in pages.items() for phase in page['phases']]
+  largest = sorted(phases, key=lambda item: -item[1]['peak_bytes'])[:top]
+  report = {
+    'summary': {
+      'slowest_pages': [{'page': name, 'duration_ms': page['duration_ms']} for name, page in slowest],
+      'largest_allocations': [
+        {'page': name, 'phase': phase['name'], 'peak_bytes': phase['peak_bytes']} for name, phase in largest
+      ],
+    },
+    'pages': pages,
+  }
+  with open(os.path.join(directory, PROFILE_REPORT), "w", encoding="utf-8") as file:
+    json.dump(report, file, indent=1)
+
+  events = [{
+    'name': span['page'] if span['name'] == 'page' else span['name'],
+    'cat': 'page' if span['name'] == 'page' else 'phase',
+    'ph': 'X', 'pid': span['pid'], 'tid': span['pid'],
+    'ts': (span['start'] - origin) / 1000, 'dur': span['duration'] / 1000,
+    'args': {'page': span['page'], 'allocated_bytes': span['allocated'], 'peak_bytes': span['peak']},
+  } for span in spans]
+  with open(os.path.join(directory, PROFILE_TRACE), "w", encoding="utf-8") as file:
+    json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+  print(f'Profile written to {PROFILE_REPORT} and {PROFILE_TRACE}')
+  print('  slowest pages:')
+  for name, page in slowest:
+    print(f'    {page["duration_ms"]:9.1f} ms  {name}')
+  print('  largest allocations:')
+  for name, phase in largest:
+    print(f'    {phase["peak_bytes"] / 1024:9.1f} KiB  {name}: {phase["name"]}')
+
+def get_tree_manifest(directory):
+  """Returns {path relative to directory: [size, sha256]} for the files under directory."""
+  manifest = {}
+  for path in snapshot_tree(directory):
+    manifest[os.path.relpath(path, directory).replace(os.sep, '/')] = [os.path.getsize(path), hash_file(path)]
+  return manifest
+
+def get_release_name(releases):
+  name = base = time.strftime('%Y%m%d-%H%M%S')
+  number = 1
+  while os.path.exists(os.path.join(releases, name)):
+    number += 1
+    name = f'{base}-{number}'
+  return name
+
+def deploy(directory, target, keep = 5):
+  """Publishes directory as a new release in target/releases/<name>/ and atomically points the
+  target/current symlink at it. Files whose content the current release already has are hardlinked
+  from it, so only new and changed files are copied; releases past the newest keep are removed."""
+  releases = os.path.join(target, 'releases')
+  current = os.path.join(target, 'current')
+  os.makedirs(releases, exist_ok=True)
+  manifest = get_tree_manifest(directory)
+
+  previous = None
+  previous_manifest = {}
+  if os.path.islink(current):
+    previous = os.path.join(releases, os.path.basename(os.readlink(current)))
+    try:
+      with open(f'{previous}.json', encoding="utf-8") as file:
+        previous_manifest = json.load(file)
+    except (OSError, ValueError):
+      previous_manifest = {}
+  if previous_manifest and previous_manifest == manifest:
+    print(f'Deploy: {target} already serves this build ({os.path.basename(previous)})')
+    return
+
+  # A file moved to another path is linked as well, since files are matched by content
+  previous_paths = {digest: path for path, (_, digest) in previous_manifest.items()}
+  name = get_release_name(releases)
+  staging = os.path.join(releases, f'{name}.partial')
+  if os.path.exists(staging):
+    shutil.rmtree(staging)
+  counts = Counter()
+  for path, (size, digest) in sorted(manifest.items()):
+    dest = os.path.join(staging, path)
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    old = previous_paths.get(digest)
+    if old is not None and os.path.isfile(os.path.join(previous, old)):
+      counts[f'linked ({link_or_copy(os.path.join(previous, old), dest)})'] += 1
+    else:
+      # Copied rather than linked, since the generator may rewrite files in docs in place
+      counts[f'copied ({copy_file(os.path.join(directory, path), dest)})'] += 1
+      counts['bytes copied'] += size
+  os.rename(staging, os.path.join(releases, name))
+  write_file(os.path.join(releases, f'{name}.json'), json.dumps(manifest, indent=1, sort_keys=True))
+
+  # Swap the symlink with a rename so the target is never without a release
+  temp_link = f'{current}.{os.getpid()}.tmp'
+  os.symlink(os.path.join('releases', name), temp_link)
+  os.replace(temp_link, current)
+
+  # Old releases only free the files no newer release links to
+  names = sorted((entry for entry in os.listdir(releases) if os.path.isdir(os.path.join(releases, entry))),
+                 key=get_natural_key)
+  removed = 0
+  for entry in names:
+    if entry.endswith('.partial') or (entry in names[:-keep] and entry != name):
+      shutil.rmtree(os.path.join(releases, entry))
+      if os.path.exists(os.path.join(releases, f'{entry}.json')):
+        os.remove(os.path.join(releases, f'{entry}.json'))
+      removed += 1
+
+  print(f'Deployed {len(manifest)} files to {os.path.join(target, "releases", name)}, removed {removed} old releases')
+  for event, count in sorted(counts.items()):
+    print(f'  {event}: {count}')
+
+LIVE_RELOAD_PATH = '/__livereload'
+
+class LiveReload:
+  """Counts finished rebuilds and wakes the browsers waiting for the next one."""
+
+  def __init__(self):
+    self.condition = threading.Condition()
+    self.generation = 0
+
+  def notify(self):
+    with self.condition:
+      self.generation += 1
+      self.condition.notify_all()
+
+  def wait(self, generation, timeout):
+    with self.condition:
+      self.condition.wait_for(lambda: self.generation != generation, timeout)
+      return self.generation
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+  """Serves the built site, with a script in every page that reloads it after a rebuild."""
+  live_reload = None
+
+  def do_GET(self):
+    if self.path == LIVE_RELOAD_PATH:
+      return self.send_reloads()
+    path = self.translate_path(self.path)
+    if os.path.isdir(path) and self.path.split('?')[0].endswith('/'):
+      path = os.path.join(path, 'index.html')
+    if not path.endswith('.html') or not os.path.isfile(path):
+      return super().do_GET()
+
+    with open(path, encoding="utf-8") as file:
+      page = file.read()
+    script = TEMPLATES.render('live_reload', path=LIVE_RELOAD_PATH)
+    position = page.rfind('</body>')
+    page = page + script if position == -1 else page[:position] + script + page[position:]
+    data = page.encode('utf-8')
+    self.send_response(200)
+    self.send_header('Content-Type', 'text/html; charset=utf-8')
+    self.send_header('Content-Length', str(len(data)))
+    self.send_header('Cache-Control', 'no-store')
+    self.end_headers()
+    self.wfile.write(data)
+
+  def send_reloads(self):
+    self.send_response(200)
+    self.send_header('Content-Type', 'text/event-stream')
+    self.send_header('Cache-Control', 'no-store')
+    self.end_headers()
+    generation = self.live_reload.generation
+    try:
+      while True:
+        # Comments keep idle connections open and reveal the ones the browser closed
+        latest = self.live_reload.wait(generation, 15)
+        self.wfile.write(b'data: reload\n\n' if latest != generation else b': idle\n\n')
+        self.wfile.flush()
+        generation = latest
+    except (BrokenPipeError, ConnectionResetError):
+      pass
+
+  def log_message(self, format, *args):
+    if self.path != LIVE_RELOAD_PATH:
+      super().log_message(format, *args)
+
+def get_watched_files(directory):
+  """Returns {path: mtime} for the generator and the content, media and assets of the site."""
+  files = {os.path.abspath(__file__): os.stat(os.path.abspath(__file__)).st_mtime_ns}
+  for folder in [CONTENT_DIRECTORY, os.path.join(directory, 'data'), os.path.join(directory, 'assets')]:
+    for root, _, names in os.walk(folder):
+      for name in names:
+        path = os.path.join(root, name)
+        try:
+          files[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+          pass
+  return files
+
+def reload_generator():
+  """Runs the edited generator in a fresh namespace and returns it."""
+  path = os.path.abspath(__file__)
+  with open(path, encoding="utf-8") as file:
+    code = compile(file.read(), path, 'exec')
+  namespace = {'__name__': 'generate', '__file__': path}
+  exec(code, namespace)
+  return namespace
+
+def serve(directory, port, **options):
+  """Hosts the site on localhost and rebuilds the affected pages whenever the generator,
+  the content, the media or the assets change, then reloads the open pages."""
+  # Rebuilds are small, and reloaded code cannot be sent to worker processes
+  options['jobs'] = 1
+  namespace = globals()
+  namespace['build'](directory, **options)
+  options['force'] = False
+
+  live_reload = LiveReload()
+  handler = type('Handler', (DevRequestHandler,), {'live_reload': live_reload})
+  server = ThreadingHTTPServer(('127.0.0.1', port), functools.partial(handler, directory=directory))
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  print(f'Serving {directory} at http://127.0.0.1:{port}/, watching for changes')
+
+  watched = get_watched_files(directory)
+  try:
+    while True:
+      time.sleep(0.05)
+      changed = get_watched_files(directory)
+      if changed == watched:
+        continue
+      start = time.perf_counter()
+      try:
+        if changed.get(os.path.abspath(__file__)) != watched.get(os.path.abspath(__file__)):
+          namespace = reload_generator()
+        namespace['build'](directory, **options)
+      except Exception as error:
+        print(f'Rebuild failed: {error!r}')
+      else:
+        print(f'Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms')
+        live_reload.notify()
+      # Files the build wrote itself (thumbnails, bundles) are not changes to react to
+      watched = get_watched_files(directory)
+  except KeyboardInterrupt:
+    server.shutdown()
+
+def parse_page_size(value):
+  section, _, size = value.partition('=')
+  if section not in LISTING_SECTIONS or not size.isdigit() or int(size) < 1:
+    raise argparse.ArgumentTypeError(f'expected SECTION=N with SECTION one of {", ".join(LISTING_SECTIONS)}')
+  return section, int(size)
 
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate the static website in docs/')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render every page, ignoring the build manifest')
+    parser.add_argument('--jobs', '-j', type=int, default=1, metavar='N',
+                        help='render pages on N worker processes (0 = one per CPU)')
+    parser.add_argument('--validate', action='store_true',
+                        help='check every rendered page against a BeautifulSoup rendering')
+    parser.add_argument('--no-thumbnails', dest='thumbnails', action='store_false',
+                        help='link list thumbnails at full size instead of resized copies')
+    parser.add_argument('--video-loading', choices=['lazy', 'eager'], default='lazy',
+                        help='lazy videos only load and autoplay once scrolled into view (default: lazy)')
+    parser.add_argument('--no-faststart', dest='faststart', action='store_false',
+                        help='publish MP4 videos as they are instead of moving their index to the front')
+    parser.add_argument('--icons', choices=['svg', 'font'], default='svg',
+                        help='inline the icons as SVG (default) or load the Font Awesome webfont')
+    parser.add_argument('--bundle-css', action='store_true',
+                        help='link one minified stylesheet holding only the rules the pages use')
+    parser.add_argument('--css-safelist', action='append', default=[], metavar='CLASS',
+                        help='keep the rules of CLASS (or #ID) in the --bundle-css stylesheet although no page '
+                             'uses it, e.g. for classes set by scripts; may be repeated')
+    parser.add_argument('--minify-html', action='store_true',
+                        help='collapse whitespace and drop comments and redundant quotes from the pages')
+    parser.add_argument('--fingerprint-assets', action='store_true',
+                        help='publish referenced assets under content-hashed names with immutable cache headers')
+    parser.add_argument('--precompress', action='store_true',
+                        help='write .gz (.br, .zst when available) siblings of every compressible file in docs')
+    parser.add_argument('--verify-media', action='store_true',
+                        help='compare content hashes, not just size and mtime, before skipping a media copy')
+    parser.add_argument('--media-jobs', type=int, default=4, metavar='N',
+                        help='copy up to N media files at once (default: 4)')
+    parser.add_argument('--page-size', action='append', default=[], metavar='SECTION=N',
+                        type=parse_page_size,
+                        help=f'show N items of a home page section ({", ".join(LISTING_SECTIONS)}) and '
+                             'move the rest to SECTION/page-K/ pages; may be repeated')
+    parser.add_argument('--listing-index', action='store_true',
+                        help='write a JSON index of the split sections so the home page loads more items in place')
+    parser.add_argument('--search', action='store_true',
+                        help='add a search box to the home page, backed by an index built with the site')
+    parser.add_argument('--author-pages', action='store_true',
+                        help='write a page per author listing their publications and co-authors')
+    parser.add_argument('--profile', action='store_true',
+                        help=f'time the phases of every rendered page and trace their allocations into '
+                             f'{PROFILE_REPORT} and {PROFILE_TRACE} (slows the build down)')
+    parser.add_argument('--service-worker', action='store_true',
+                        help=f'write a service worker that precaches the pages and the files they load, '
+                             f'listed by content hash in {PRECACHE_MANIFEST}, and caches videos as they play')
+    parser.add_argument('--deploy', metavar='TARGET',
+                        help='after building, publish docs/ as a new release in TARGET/releases and point '
+                             'TARGET/current at it, copying only new or changed files')
+    parser.add_argument('--keep-releases', type=int, default=5, metavar='N',
+                        help='releases kept in the --deploy target (default: 5)')
+    parser.add_argument('--serve', action='store_true',
+                        help='host docs/ locally, rebuilding and reloading the pages whenever sources change')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='port of the --serve server (default: 8000)')
+    args = parser.parse_args()
+
+    options = dict(force=args.force, jobs=args.jobs, validate=args.validate,
+          thumbnails=args.thumbnails, verify_media=args.verify_media, media_jobs=args.media_jobs,
+          video_loading=args.video_loading, faststart=args.faststart, bundle_css=args.bundle_css,
+          icons=args.icons, css_safelist=args.css_safelist, fingerprint_assets=args.fingerprint_assets,
+          minify_html=args.minify_html, precompress=args.precompress,
+          page_sizes=dict(args.page_size), listing_index=args.listing_index, search=args.search,
+          author_pages=args.author_pages, profile=args.profile, service_worker=args.service_worker)
+    if args.serve:
+      serve('docs/', args.port, **options)
+    else:
+      build('docs/', **options)
+      if args.deploy:
+        deploy('docs/', args.deploy, max(1, args.keep_releases))
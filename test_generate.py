@@ -0,0 +1,211 @@
+"""Checks of the MP4 faststart rewriter, html minifier, css pruner and incremental writes in
+generate.py; run with python -m unittest."""
+import os
+import struct
+import tempfile
+import unittest
+
+import generate
+
+CHUNKS = [b'first chunk', b'second, longer chunk', b'third']
+
+def make_box(kind, payload):
+  return struct.pack('>I4s', 8 + len(payload), kind) + payload
+
+def make_offset_table(kind, offsets):
+  layout = 'I' if kind == b'stco' else 'Q'
+  return make_box(kind, struct.pack(f'>4xI{len(offsets)}{layout}', len(offsets), *offsets))
+
+def make_moov(table):
+  return make_box(b'moov', make_box(b'trak', make_box(b'mdia', make_box(b'minf', make_box(b'stbl', table)))))
+
+def make_moov_last_mp4(kind):
+  """Returns an MP4 whose moov, with a chunk offset table of the given kind, follows the mdat."""
+  ftyp = make_box(b'ftyp', b'isom' + bytes(4) + b'isommp41')
+  offsets = []
+  offset = len(ftyp) + 8
+  for chunk in CHUNKS:
+    offsets.append(offset)
+    offset += len(chunk)
+  return ftyp + make_box(b'mdat', b''.join(CHUNKS)) + make_moov(make_offset_table(kind, offsets))
+
+def find_offset_table(data):
+  for kind, payload in generate.iter_mp4_payloads(data):
+    if kind in generate.MP4_CONTAINERS:
+      found = find_offset_table(payload)
+      if found:
+        return found
+    elif kind in (b'stco', b'co64'):
+      count = struct.unpack_from('>I', payload, 4)[0]
+      return kind, list(struct.unpack_from(f'>{count}{"I" if kind == b"stco" else "Q"}', payload, 8))
+  return None
+
+def read_chunks(data):
+  moov = dict(generate.iter_mp4_payloads(data))[b'moov']
+  _, offsets = find_offset_table(moov)
+  return [data[offset:offset + len(chunk)] for offset, chunk in zip(offsets, CHUNKS)]
+
+class FaststartTest(unittest.TestCase):
+  def rewrite(self, data):
+    with tempfile.TemporaryDirectory() as directory:
+      source = os.path.join(directory, 'source.mp4')
+      dest = os.path.join(directory, 'dest.mp4')
+      with open(source, 'wb') as file:
+        file.write(data)
+      self.assertTrue(generate.needs_faststart(source))
+      self.assertTrue(generate.make_faststart(source, dest))
+      self.assertFalse(generate.needs_faststart(dest))
+      with open(dest, 'rb') as file:
+        return file.read()
+
+  def test_moov_moves_in_front_of_mdat(self):
+    for kind in (b'stco', b'co64'):
+      data = make_moov_last_mp4(kind)
+      self.assertEqual(read_chunks(data), CHUNKS)
+      rewritten = self.rewrite(data)
+      self.assertEqual([kind for kind, _ in generate.iter_mp4_payloads(rewritten)], [b'ftyp', b'moov', b'mdat'])
+      self.assertEqual(len(rewritten), len(data))
+      self.assertEqual(find_offset_table(dict(generate.iter_mp4_payloads(rewritten))[b'moov'])[0], kind)
+      self.assertEqual(read_chunks(rewritten), CHUNKS)
+
+  def test_faststart_file_is_left_alone(self):
+    data = self.rewrite(make_moov_last_mp4(b'stco'))
+    with tempfile.TemporaryDirectory() as directory:
+      source = os.path.join(directory, 'source.mp4')
+      with open(source, 'wb') as file:
+        file.write(data)
+      self.assertFalse(generate.make_faststart(source, os.path.join(directory, 'dest.mp4')))
+
+  def test_offsets_past_4_gib_switch_stco_to_co64(self):
+    moov = dict(generate.iter_mp4_payloads(make_moov(make_offset_table(b'stco', [16, 1 << 31]))))[b'moov']
+    shift = lambda offset: offset + (1 << 31)
+    with self.assertRaises(OverflowError):
+      generate.patch_chunk_offsets(moov, shift, False)
+    patched = generate.patch_chunk_offsets(moov, shift, True)
+    self.assertEqual(find_offset_table(patched), (b'co64', [16 + (1 << 31), 1 << 32]))
+
+class MinifyHtmlTest(unittest.TestCase):
+  def test_whitespace_comments_and_quotes(self):
+    html = '<div class="a">\n  <!-- note -->\n  <span  id="x">one</span>\n  two  </div>'
+    self.assertEqual(generate.minify_html(html), '<div class=a><span id=x>one</span> two</div>')
+
+  def test_raw_elements_are_copied(self):
+    html = '<pre>  a\n  b  </pre>\n<script>if (a  <b) {}</script>'
+    self.assertEqual(generate.minify_html(html), html.replace('\n<script>', '<script>'))
+
+  def test_chunks_match_whole_input(self):
+    html = '<p>Some <b class="x y">bold</b>\n text <!-- c --> <a href="a b">link</a></p><pre> x </pre>'
+    for size in (1, 2, 5, 7):
+      minifier = generate.HtmlMinifier()
+      chunks = [minifier.feed(html[start:start + size]) for start in range(0, len(html), size)]
+      self.assertEqual(''.join(chunks) + minifier.close(), generate.minify_html(html))
+
+  def test_unquoted_value_with_equals(self):
+    minifier = generate.HtmlMinifier()
+    # The tag is complete, so nothing is held back for the next chunk
+    self.assertEqual(minifier.feed('<p><a href=page?a=b class=x>link</a> text</p>'),
+      '<p><a href="page?a=b" class=x>link</a> text</p>')
+    self.assertEqual(minifier.close(), '')
+
+class PruneCssTest(unittest.TestCase):
+  CSS = '.used{color:red}.unused{color:blue}.used,.unused b{margin:0}@media (min-width:1px){.unused{x:y}}.text-muted{color:gray}.lead{font-size:2em}'
+
+  def prune(self, html):
+    used = set(generate.CSS_SAFELIST) | set(generate.OPTIONS['css_safelist']) | generate.get_used_css_names(html)
+    return generate.serialize_css(generate.prune_css(generate.parse_css(self.CSS), used))
+
+  def test_unused_rules_are_dropped(self):
+    self.assertEqual(self.prune('<p class="used">x</p>'), '.used{color:red}.used{margin:0}.text-muted{color:gray}')
+
+  def test_safelist_keeps_rules(self):
+    self.assertIn('text-muted', generate.CSS_SAFELIST)
+    safelist = generate.OPTIONS['css_safelist']
+    generate.OPTIONS['css_safelist'] = ['lead']
+    try:
+      self.assertIn('.lead{font-size:2em}', self.prune('<p>x</p>'))
+    finally:
+      generate.OPTIONS['css_safelist'] = safelist
+
+class BuildManifestTest(unittest.TestCase):
+  def setUp(self):
+    directory = tempfile.TemporaryDirectory()
+    self.addCleanup(directory.cleanup)
+    self.directory = directory.name
+    self.page = generate.Page(os.path.join(self.directory, 'page'), None, {}, {})
+    self.media = os.path.join(self.directory, 'page', 'video.mp4')
+    self.manifest = generate.BuildManifest(os.path.join(self.directory, 'manifest.json'))
+    self.manifest.record(self.page, {'digest': 'a', 'media': [], 'outputs': [self.media]})
+
+  def publish(self):
+    os.makedirs(self.page.path)
+    for path in (self.page.output, self.media):
+      with open(path, 'w') as file:
+        file.write('x')
+
+  def test_fresh_when_digest_and_outputs_match(self):
+    self.publish()
+    self.assertTrue(self.manifest.is_fresh(self.page, {'digest': 'a'}))
+
+  def test_stale_when_digest_changes(self):
+    self.publish()
+    self.assertFalse(self.manifest.is_fresh(self.page, {'digest': 'b'}))
+
+  def test_stale_when_page_or_media_is_missing(self):
+    self.assertFalse(self.manifest.is_fresh(self.page, {'digest': 'a'}))
+    self.publish()
+    os.remove(self.media)
+    self.assertFalse(self.manifest.is_fresh(self.page, {'digest': 'a'}))
+
+  def test_unknown_page_is_stale(self):
+    self.publish()
+    self.assertFalse(generate.BuildManifest(os.path.join(self.directory, 'other.json')).is_fresh(self.page, {'digest': 'a'}))
+
+class WriteIfChangedTest(unittest.TestCase):
+  def setUp(self):
+    directory = tempfile.TemporaryDirectory()
+    self.addCleanup(directory.cleanup)
+    self.path = os.path.join(directory.name, 'index.html')
+    self.directory = directory.name
+
+  def set_old_mtime(self):
+    os.utime(self.path, ns=(1, 1))
+
+  def read(self):
+    with open(self.path, encoding='utf-8') as file:
+      return file.read()
+
+  def test_write_file(self):
+    self.assertTrue(generate.write_file(self.path, 'one'))
+    self.set_old_mtime()
+    self.assertFalse(generate.write_file(self.path, 'one'))
+    self.assertEqual(os.stat(self.path).st_mtime_ns, 1)
+    self.assertTrue(generate.write_file(self.path, b'two'))
+    self.assertNotEqual(os.stat(self.path).st_mtime_ns, 1)
+    self.assertEqual(self.read(), 'two')
+
+  def write_page(self, chunks):
+    with generate.HtmlWriter(self.path, buffer_size=4) as writer:
+      for chunk in chunks:
+        writer.write(chunk)
+
+  def test_html_writer(self):
+    self.write_page(['<p>', 'one', '</p>'])
+    self.set_old_mtime()
+    self.write_page(['<p>one', '</p>'])
+    self.assertEqual(os.stat(self.path).st_mtime_ns, 1)
+    self.write_page(['<p>two</p>'])
+    self.assertNotEqual(os.stat(self.path).st_mtime_ns, 1)
+    self.assertEqual(self.read(), '<p>two</p>')
+    self.assertEqual(os.listdir(self.directory), ['index.html'])
+
+  def test_html_writer_keeps_page_on_error(self):
+    self.write_page(['<p>one</p>'])
+    with self.assertRaises(ValueError):
+      with generate.HtmlWriter(self.path) as writer:
+        writer.write('<p>half')
+        raise ValueError
+    self.assertEqual(self.read(), '<p>one</p>')
+    self.assertEqual(os.listdir(self.directory), ['index.html'])
+
+if __name__ == '__main__':
+  unittest.main()